@@ -0,0 +1,126 @@
+"""
+Dublês locais do Groq (LLM do CrewAI) e do HuggingFace InferenceClient.
+
+Latência e taxa de falha são configuráveis, para medir o pipeline sem rede
+e de forma reprodutível (o gerador aleatório é semeado).
+"""
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from typing import Any, List, Optional
+
+try:
+    from crewai import BaseLLM
+except ImportError:  # versões antigas do CrewAI / ambiente sem crewai
+    BaseLLM = object
+
+class FakeServiceError(RuntimeError):
+    """Falha simulada (equivalente a um 503 do provedor: entra nos retries do ServiceClient)."""
+    status_code = 503
+
+class _Latency:
+    def __init__(self, latency_s: float, jitter_s: float, failure_rate: float, seed: int):
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    def wait(self, what: str):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency_s + self._rng.uniform(0, self.jitter_s)
+            fail = self._rng.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        time.sleep(delay)
+        if fail:
+            raise FakeServiceError(f"Falha simulada em {what}")
+
+def _flatten(messages: Any) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(str(m.get("content", "")) if isinstance(m, dict) else str(m) for m in messages)
+
+def fake_deck_json(num_slides: int, seed: int = 0) -> str:
+    """JSON no formato que o formatador deveria devolver."""
+    rng = random.Random(seed)
+    words = "dados modelo escala custo cliente produto risco métrica equipe nuvem".split()
+    slides = []
+    for i in range(num_slides):
+        slides.append({
+            "id": f"s{i + 1}",
+            "type": "TITLE_BULLETS",
+            "title": " ".join(rng.choice(words) for _ in range(4)).capitalize(),
+            "bullets": [" ".join(rng.choice(words) for _ in range(8)) for _ in range(4)],
+            "image": {"status": "missing"},
+        })
+    return json.dumps({"meta": {"title": "Deck de benchmark", "audience": "misto", "theme_id": "default"},
+                       "slides": slides}, ensure_ascii=False)
+
+class FakeLLM(BaseLLM):
+    """
+    LLM local compatível com `crewai.LLM.call`.
+
+    A formatação estruturada recebe o JSON de um deck com `num_slides`
+    slides (ou de um slide, no re-pedido/fan-out); os agentes da crew recebem
+    um texto curto no formato "Final Answer:" que o executor do CrewAI espera.
+    """
+
+    def __init__(self, num_slides: int = 5, latency_s: float = 0.0, jitter_s: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0):
+        if BaseLLM is not object:
+            super().__init__(model="fake/slidegen", temperature=0.0)
+        else:
+            self.model = "fake/slidegen"
+            self.temperature = 0.0
+        self.num_slides = num_slides
+        self.stats = _Latency(latency_s, jitter_s, failure_rate, seed)
+        self._deck_json = fake_deck_json(num_slides, seed)
+        self._slides = json.loads(self._deck_json)["slides"]
+
+    def call(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+             available_functions: Optional[dict] = None, **kwargs) -> str:
+        self.stats.wait("LLM")
+        text = _flatten(messages)
+        # Formatação estruturada é chamada direta (fora da crew): JSON cru
+        if "JSON Schema (DeckIR)" in text:
+            return self._deck_json
+        if "JSON Schema (SlideIR)" in text:
+            match = re.search(r'"id" é "s(\d+)"', text)
+            index = int(match.group(1)) - 1 if match else 0
+            return json.dumps(self._slides[index % len(self._slides)], ensure_ascii=False)
+        answer = "\n".join(f"Slide {i + 1}: conteúdo planejado." for i in range(self.num_slides))
+        return f"Thought: Tenho a resposta.\nFinal Answer: {answer}"
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 128_000
+
+# Blocos de cor aleatórios ampliados: detalhe suficiente para o validador, geração barata
+TEXTURE_TILE = (16, 9)
+
+class FakeInferenceClient:
+    """Substituto de `huggingface_hub.InferenceClient.text_to_image`."""
+
+    def __init__(self, latency_s: float = 0.0, jitter_s: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.stats = _Latency(latency_s, jitter_s, failure_rate, seed)
+
+    def text_to_image(self, prompt: str, model: Optional[str] = None, width: int = 1280, height: int = 720, **kwargs):
+        from PIL import Image
+        self.stats.wait("HF")
+        # Textura derivada do prompt (sha1, não hash(): este muda a cada processo).
+        # Cor lisa seria reprovada pelo validador e regerada, dobrando as chamadas ao HF.
+        rng = random.Random(hashlib.sha1(prompt.encode("utf-8")).digest())
+        tile = Image.frombytes("RGB", TEXTURE_TILE, bytes(rng.randrange(40, 256) for _ in range(TEXTURE_TILE[0] * TEXTURE_TILE[1] * 3)))
+        return tile.resize((width, height), Image.BILINEAR)
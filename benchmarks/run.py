@@ -0,0 +1,382 @@
+"""
+Suíte de benchmarks offline do SlideGen.
+
+Roda cada cenário com dublês locais (FakeLLM / FakeInferenceClient) e grava
+vazão, latência p50/p95 e pico de RSS em JSON para comparar execuções
+(o cenário ir acrescenta pico e memória retida via tracemalloc).
+
+Uso:
+    python -m benchmarks.run --output bench_output.json
+    python -m benchmarks.run --only layout render --slides 5 50 500
+    python -m benchmarks.run --compare bench_baseline.json --tolerance 0.2
+"""
+import gc
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import statistics
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List
+
+from src.core.utils import sanitize_text
+from src.engine.layout import compute_layout
+from benchmarks.synthetic import make_deck, make_images, sentence
+
+SIZES_BYTES = [1_000, 100_000, 1_000_000, 10_000_000]
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def measure(fn: Callable[[], None], repeats: int, items: int) -> Dict:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            fn()
+        samples.append(time.perf_counter() - start)
+    p50 = percentile(samples, 50)
+    return {
+        "repeats": repeats,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "items": items,
+        "throughput_per_s": round(items / p50, 2) if p50 else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+def traced_kb(fn: Callable[[], object]) -> Dict:
+    """Pico de memória e o que fica retido pelo resultado (tracemalloc, uma execução)."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    with redirect_stdout(io.StringIO()):
+        result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"peak_kb": round((peak - before) / 1024, 1), "retained_kb": round((current - before) / 1024, 1)}
+
+def make_context(size: int, seed: int = 0) -> str:
+    """Texto bruto com bullets unicode, espaços e quebras repetidas (o que o sanitize limpa)."""
+    rng = random.Random(seed)
+    parts, total = [], 0
+    while total < size:
+        line = rng.choice(["• ", "* ", "◦  ", ""]) + sentence(rng, rng.randint(5, 15)) + rng.choice(["\n", "\n\n\n", "  \t\n"])
+        parts.append(line)
+        total += len(line)
+    return "".join(parts)[:size]
+
+def broken_crew_output(num_slides: int) -> dict:
+    """Estrutura que o LLM às vezes devolve: dict de slides em vez de {meta, slides}."""
+    rng = random.Random(num_slides)
+    return {f"Slide {i + 1}": {"Título": sentence(rng, 5), "conteudo": [sentence(rng, 8) for _ in range(4)]}
+            for i in range(num_slides)}
+
+# --- Cenários ---
+
+def bench_sanitize(args) -> List[Dict]:
+    out = []
+    for size in args.context_bytes:
+        text = make_context(size)
+        r = measure(lambda: sanitize_text(text), args.repeats, size)
+        r.update(scenario="sanitize_text", context_bytes=size,
+                 mb_per_s=round(size / 1e6 / (r["p50_ms"] / 1000), 2) if r["p50_ms"] else None)
+        out.append(r)
+    return out
+
+def bench_heal(args) -> List[Dict]:
+    from src.agents.manager import SlideCrewManager
+    from benchmarks.fakes import FakeLLM
+    with redirect_stdout(io.StringIO()):
+        manager = SlideCrewManager(api_key=None, llm=FakeLLM(), rpm=0, tpm=0)
+    out = []
+    for n in args.slides:
+        data = broken_crew_output(n)
+        r = measure(lambda: manager._heal_json_structure(data), args.repeats, n)
+        r.update(scenario="heal_json_structure", slides=n)
+        out.append(r)
+    return out
+
+def bench_layout(args) -> List[Dict]:
+    """Ajuste de texto: quente (tabelas de largura já montadas) e frio (primeiro deck do processo)."""
+    from src.engine.layout import reset_text_metrics
+
+    def _cold(deck):
+        reset_text_metrics()
+        compute_layout(deck)
+
+    out = []
+    for bullets in args.bullets:
+        for n in args.slides:
+            deck = make_deck(n, ["/tmp/fake.png"], bullets=bullets)
+            layout = compute_layout(deck)
+            overflow = sum(b.overflow for s in layout.slides for b in s.boxes)
+            for scenario, fn in (("compute_layout", lambda: compute_layout(deck)),
+                                 ("compute_layout_cold", lambda: _cold(deck))):
+                r = measure(fn, args.repeats, n)
+                r.update(scenario=scenario, slides=n, bullets=bullets, overflow_boxes=overflow)
+                out.append(r)
+    return out
+
+def bench_qa(args) -> List[Dict]:
+    """QA editorial: avaliação, correções e gate; a cópia profunda do deck entra como referência."""
+    import copy
+    from src.engine.qa import run_editorial_qa, apply_tickets, qa_gate
+    out = []
+    for n in args.qa_slides:
+        deck = make_deck(n, ["/tmp/fake.png"], bullets=args.qa_bullets)
+        envelope = run_editorial_qa(deck)
+        for scenario, fn in (("qa_evaluate", lambda: run_editorial_qa(deck)),
+                             ("qa_apply", lambda: apply_tickets(deck, envelope.tickets)),
+                             ("qa_gate", lambda: qa_gate(deck)),
+                             ("deck_deepcopy", lambda: copy.deepcopy(deck))):
+            r = measure(fn, args.repeats, n)
+            r.update(scenario=scenario, slides=n, bullets=args.qa_bullets, tickets=len(envelope.tickets))
+            out.append(r)
+    return out
+
+def bench_image_val(args) -> List[Dict]:
+    """Validação de imagens a frio (cabeçalho + miniatura + pHash) e a quente (cache por hash do arquivo)."""
+    from src.services.image_val import ImageValidatorService
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.val_images:
+            paths = make_images(tmp, n)
+            # Cada imagem aparece duas vezes: a segunda metade é toda de duplicatas
+            items = [(f"s{i + 1}", path) for i, path in enumerate(paths + paths)]
+            warm = ImageValidatorService()
+            checks = warm.validate_many(items, max_workers=args.image_workers)
+            for scenario, fn in (("image_val_cold", lambda: ImageValidatorService().validate_many(items, max_workers=args.image_workers)),
+                                 ("image_val_warm", lambda: warm.validate_many(items, max_workers=args.image_workers))):
+                r = measure(fn, args.repeats, len(items))
+                r.update(scenario=scenario, images=len(items), workers=args.image_workers,
+                         duplicates=sum(c.duplicate_of is not None for c in checks.values()))
+                out.append(r)
+    return out
+
+def bench_fallback(args) -> List[Dict]:
+    """Placeholders locais (sem HF): desenho em linha contra o pool de processos, já aquecido."""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.services.fallback_render import FallbackRenderer, render_fallback_png
+    size = (1280, 720)
+    n = args.fallback_images
+    prompts = [(f"Professional illustration, cinematic lighting. Subject: tema {i}. "
+                f"Context: métricas, receita e riscos da plataforma.", f"s{i + 1}") for i in range(n)]
+
+    def _inline():
+        for prompt, slide_id in prompts:
+            render_fallback_png(prompt, slide_id, size)
+
+    r = measure(_inline, args.repeats, n)
+    r.update(scenario="fallback_inline", images=n, workers=1)
+    out = [r]
+    for workers in args.fallback_workers:
+        renderer = FallbackRenderer(max_workers=workers)
+
+        def _pool():
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for f in [pool.submit(renderer.render, prompt, slide_id, size) for prompt, slide_id in prompts]:
+                    f.result()
+
+        try:
+            # Sobe os processos e carrega fontes/fundos fora da medição
+            _pool()
+            r = measure(_pool, args.repeats, n)
+        finally:
+            renderer.close()
+        r.update(scenario="fallback_pool", images=n, workers=workers)
+        out.append(r)
+    return out
+
+def bench_ir(args) -> List[Dict]:
+    """Custo da IR em decks grandes: tempo, pico e memória retida de ingestão, layout e recarga do manifesto."""
+    from src.core.models import DeckIR
+    from src.engine.layout import LayoutSlide
+    out = []
+    for n in args.ir_slides:
+        deck = make_deck(n, ["/tmp/fake.png"], bullets=args.qa_bullets)
+        payload = deck.model_dump(mode="json")
+        dumped = [ls.model_dump(mode="json") for ls in compute_layout(deck).slides]
+        for scenario, fn in (("ir_ingest", lambda: DeckIR.model_validate(payload)),
+                             ("ir_layout", lambda: compute_layout(deck)),
+                             ("ir_manifest_reload", lambda: [LayoutSlide.model_validate(d) for d in dumped])):
+            r = measure(fn, args.repeats, n)
+            r.update(scenario=scenario, slides=n, bullets=args.qa_bullets, **traced_kb(fn))
+            out.append(r)
+    return out
+
+def bench_render(args) -> List[Dict]:
+    from src.engine.renderer import render_pptx
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        images = make_images(tmp, args.unique_images)
+        for n in args.slides:
+            layout = compute_layout(make_deck(n, images))
+            buf = io.BytesIO()
+            r = measure(lambda: render_pptx(layout, io.BytesIO(), image_workers=args.image_workers), args.repeats, n)
+            render_pptx(layout, buf, image_workers=args.image_workers)
+            r.update(scenario="render_pptx", slides=n, unique_images=args.unique_images, output_bytes=buf.tell())
+            out.append(r)
+    return out
+
+def bench_pipeline(args) -> List[Dict]:
+    from src.pipeline import run_pipeline
+    from src.agents.manager import SlideCrewManager
+    from src.services.image_gen import ImageGeneratorService
+    from benchmarks.fakes import FakeLLM, FakeInferenceClient
+
+    out = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.slides:
+            llm = FakeLLM(num_slides=n, latency_s=args.llm_latency, failure_rate=args.llm_failure_rate)
+            hf = FakeInferenceClient(latency_s=args.hf_latency, failure_rate=args.hf_failure_rate)
+            failures = []
+
+            def _run():
+                with redirect_stdout(io.StringIO()):
+                    manager = SlideCrewManager(api_key=None, llm=llm, rpm=0, tpm=0)
+                    img_gen = ImageGeneratorService(output_dir=os.path.join(tmp, "assets"), hf_client=hf)
+                    path = run_pipeline(f"Deck com {n} slides", make_context(args.pipeline_context_bytes),
+                                        os.path.join(tmp, f"deck_{n}.pptx"), groq_key=None,
+                                        max_image_workers=args.image_workers,
+                                        manager=manager, img_gen=img_gen)
+                if not path:
+                    failures.append(n)
+
+            r = measure(_run, args.pipeline_repeats, n)
+            r.update(scenario="run_pipeline", slides=n, failed_runs=len(failures),
+                     llm_calls=llm.stats.calls, hf_calls=hf.stats.calls, hf_failures=hf.stats.failures)
+            out.append(r)
+    return out
+
+def bench_http(args) -> List[Dict]:
+    """ServiceClient contra o stub local: retries, Retry-After e reuso de conexões."""
+    from src.services.service_client import ServiceClient, RetryPolicy
+    from benchmarks.stub_server import StubServer
+
+    out = []
+    for rate in args.http_failure_rates:
+        with StubServer(latency_s=args.http_latency, failure_rate=rate, status=429, retry_after=0.05) as stub:
+            client = ServiceClient(f"stub-{rate}", base_url=stub.url, retry=RetryPolicy(base_delay=0.02))
+            failures = []
+
+            def _run():
+                for _ in range(args.http_requests):
+                    try:
+                        client.request("POST", "/generate", json={"prompt": "benchmark"})
+                    except Exception:
+                        failures.append(1)
+
+            r = measure(_run, args.repeats, args.http_requests)
+            r.update(scenario="service_client", failure_rate=rate, requests_sent=stub.requests,
+                     connections=len(stub.connections), failed_calls=len(failures))
+            client.close()
+        out.append(r)
+    return out
+
+SCENARIOS = {
+    "sanitize": bench_sanitize,
+    "heal": bench_heal,
+    "layout": bench_layout,
+    "qa": bench_qa,
+    "image_val": bench_image_val,
+    "fallback": bench_fallback,
+    "ir": bench_ir,
+    "render": bench_render,
+    "pipeline": bench_pipeline,
+    "http": bench_http,
+}
+
+# Parâmetros que identificam uma linha de resultado (o resto são métricas)
+KEY_FIELDS = ("slides", "context_bytes", "failure_rate", "bullets", "images", "workers")
+
+def result_key(r: Dict) -> tuple:
+    return (r["scenario"], *(r.get(f) for f in KEY_FIELDS))
+
+def compare(current: List[Dict], baseline_path: str, tolerance: float) -> List[str]:
+    """Lista regressões de p50 acima da tolerância em relação a uma execução anterior."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    base = {result_key(r): r for r in baseline}
+    regressions = []
+    for r in current:
+        b = base.get(result_key(r))
+        if b and b["p50_ms"] and r["p50_ms"] > b["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{result_key(r)}: {b['p50_ms']} ms → {r['p50_ms']} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks offline do SlideGen")
+    parser.add_argument("--only", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--slides", type=int, nargs="+", default=[5, 50, 500])
+    parser.add_argument("--bullets", type=int, nargs="+", default=[4, 8], help="Bullets por slide no cenário layout")
+    parser.add_argument("--qa-slides", type=int, nargs="+", default=[100, 1000], help="Tamanhos de deck no cenário qa")
+    parser.add_argument("--ir-slides", type=int, nargs="+", default=[5, 50, 500, 1000], help="Tamanhos de deck no cenário ir")
+    parser.add_argument("--qa-bullets", type=int, default=7, help="Bullets por slide nos cenários qa e ir (acima de max_bullets gera tickets)")
+    parser.add_argument("--context-bytes", type=int, nargs="+", default=SIZES_BYTES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--pipeline-repeats", type=int, default=2)
+    parser.add_argument("--pipeline-context-bytes", type=int, default=10_000)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Latência simulada por chamada ao LLM (s)")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--hf-latency", type=float, default=0.2, help="Latência simulada por imagem (s)")
+    parser.add_argument("--hf-failure-rate", type=float, default=0.0)
+    parser.add_argument("--image-workers", type=int, default=4, help="Imagens simultâneas no pipeline e no render")
+    parser.add_argument("--unique-images", type=int, default=8, help="Imagens distintas nos decks do cenário render")
+    parser.add_argument("--val-images", type=int, nargs="+", default=[20, 100], help="Imagens distintas no cenário image_val")
+    parser.add_argument("--fallback-images", type=int, default=64, help="Placeholders por rodada no cenário fallback")
+    parser.add_argument("--fallback-workers", type=int, nargs="+", default=[2, 4], help="Processos do pool no cenário fallback")
+    parser.add_argument("--http-requests", type=int, default=50, help="Requisições por rodada no cenário http")
+    parser.add_argument("--http-latency", type=float, default=0.005)
+    parser.add_argument("--http-failure-rates", type=float, nargs="+", default=[0.0, 0.2])
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Regressão tolerada no p50 (fração)")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.only:
+        print(f"⏱️ {name}...")
+        for r in SCENARIOS[name](args):
+            results.append(r)
+            label = ", ".join(f"{f}={r[f]}" for f in KEY_FIELDS if r.get(f) is not None)
+            print(f"   {r['scenario']} [{label}]: p50 {r['p50_ms']} ms, p95 {r['p95_ms']} ms, "
+                  f"{r['throughput_per_s']}/s, RSS {r['peak_rss_mb']} MB")
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": vars(args),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📝 Resultados em {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"❌ Regressão: {line}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark de inicialização a frio do CLI.
+
+Mede o tempo de `main.py --help` e da falha rápida por falta de
+GROQ_API_KEY em processos novos, e confere que nenhuma dependência pesada
+é importada nesses caminhos. Sai com código 1 se o orçamento for estourado,
+servindo como gate de regressão no CI.
+
+Uso:
+    python -m benchmarks.startup --budget-ms 400 --runs 5
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Módulos que só podem ser carregados pelos estágios que os usam
+HEAVY_MODULES = ["crewai", "langchain_groq", "litellm", "pptx", "PIL", "huggingface_hub"]
+
+# Cenário -> (argv, código de saída esperado, trecho obrigatório no stdout)
+SCENARIOS = {
+    "help": (["main.py", "--help"], 0, "usage:"),
+    "missing_key": (["main.py", "--prompt", "teste"], 0, "GROQ_API_KEY não encontrada"),
+}
+
+def _env() -> dict:
+    env = dict(os.environ)
+    # String vazia: o load_dotenv não sobrescreve, e o CLI deve falhar na validação
+    env["GROQ_API_KEY"] = ""
+    return env
+
+def _check(proc: subprocess.CompletedProcess, returncode: int, expected: str) -> Optional[str]:
+    """Motivo da falha do cenário (None se saiu com o código e a mensagem esperados)."""
+    if proc.returncode != returncode:
+        tail = (proc.stderr or proc.stdout or "").strip().splitlines()[-1:] or [""]
+        return f"código {proc.returncode} (esperado {returncode}): {tail[0]}"
+    if expected and expected not in proc.stdout:
+        return f"saída sem '{expected}'"
+    return None
+
+def time_scenario(argv, runs: int, returncode: int = 0, expected: str = "") -> Tuple[list, Optional[str]]:
+    """Tempos de cada execução e o primeiro erro encontrado (processo que falhou não conta como rápido)."""
+    samples, error = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, *argv], cwd=ROOT, env=_env(), capture_output=True, text=True)
+        samples.append((time.perf_counter() - start) * 1000)
+        error = error or _check(proc, returncode, expected)
+    return samples, error
+
+def heavy_imports(argv) -> Tuple[list, Optional[str]]:
+    """Executa o cenário no mesmo interpretador e lista os módulos pesados carregados."""
+    probe = (
+        "import sys, runpy\n"
+        f"sys.argv = {argv!r}\n"
+        "try:\n"
+        "    runpy.run_path('main.py', run_name='__main__')\n"
+        "except SystemExit as e:\n"
+        "    if e.code not in (None, 0):\n"
+        "        raise\n"
+        f"print('HEAVY=' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, env=_env(),
+                         capture_output=True, text=True)
+    last = out.stdout.strip().splitlines()[-1:] or [""]
+    if out.returncode != 0 or not last[0].startswith("HEAVY="):
+        tail = out.stderr.strip().splitlines()[-1:] or [""]
+        return [], f"sonda falhou (código {out.returncode}): {tail[0]}"
+    return [m for m in last[0][len("HEAVY="):].split(",") if m], None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de cold start do CLI")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="Limite para a mediana de cada cenário")
+    parser.add_argument("--output", help="Grava os resultados em JSON")
+    args = parser.parse_args()
+
+    baseline = statistics.median(time_scenario(["-c", "pass"], args.runs)[0])
+    results, failed = {}, False
+    for name, (argv, returncode, expected) in SCENARIOS.items():
+        samples, error = time_scenario(argv, args.runs, returncode, expected)
+        median = statistics.median(samples)
+        heavy, probe_error = heavy_imports(argv)
+        error = error or probe_error
+        ok = median <= args.budget_ms and not heavy and error is None
+        failed |= not ok
+        results[name] = {
+            "median_ms": round(median, 1),
+            "max_ms": round(max(samples), 1),
+            "over_interpreter_ms": round(median - baseline, 1),
+            "heavy_imports": heavy,
+            "error": error,
+            "ok": ok,
+        }
+        icon = "✅" if ok else "❌"
+        print(f"{icon} {name}: mediana {median:.1f} ms (interpretador: {baseline:.1f} ms)"
+              + (f" — importou {', '.join(heavy)}" if heavy else "")
+              + (f" — {error}" if error else ""))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"budget_ms": args.budget_ms, "interpreter_ms": round(baseline, 1),
+                       "scenarios": results}, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Servidor HTTP local que imita um provedor instável (429 com Retry-After, 503, latência).
+
+Serve para exercitar o ServiceClient (retries, orçamento, circuit breaker e
+pool keep-alive) sem rede:
+
+    with StubServer(failure_rate=0.3) as stub:
+        client = ServiceClient("stub", base_url=stub.url)
+        client.request("POST", "/generate", json={"prompt": "..."})
+
+Também roda sozinho: python -m benchmarks.stub_server --port 8765 --failure-rate 0.2
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_s: float = 0.0,
+                 failure_rate: float = 0.0, fail_first: int = 0, status: int = 503,
+                 retry_after: float = 0.0, seed: int = 0):
+        """
+        Args:
+            fail_first: As N primeiras requisições falham (ex.: provedor voltando de uma queda).
+            failure_rate: Probabilidade de falha das demais.
+            status: Status das falhas (429 envia Retry-After = `retry_after`).
+        """
+        self.latency_s = latency_s
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.status = status
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.connections = set()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            fail = self.requests <= self.fail_first or self._rng.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+            return fail
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive: o cliente deve reaproveitar a conexão entre requisições
+            protocol_version = "HTTP/1.1"
+            # Cabeçalhos e corpo num write só (flush no fim da requisição) e TCP_NODELAY:
+            # sem isso Nagle + ACK atrasado somam ~40 ms por resposta, custo do stub e não do cliente
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                with stub._lock:
+                    stub.connections.add(self.client_address)
+                if stub.latency_s:
+                    time.sleep(stub.latency_s)
+                if stub._should_fail():
+                    body = json.dumps({"error": "stub failure"}).encode()
+                    self.send_response(stub.status)
+                    if stub.status == 429 and stub.retry_after:
+                        self.send_header("Retry-After", str(stub.retry_after))
+                else:
+                    body = json.dumps({"ok": True, "path": self.path}).encode()
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _reply
+            do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Provedor HTTP instável para testes locais")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, default=0.0)
+    args = parser.parse_args()
+
+    stub = StubServer(port=args.port, latency_s=args.latency, failure_rate=args.failure_rate,
+                      fail_first=args.fail_first, status=args.status, retry_after=args.retry_after)
+    print(f"🧪 Stub em {stub.url} (Ctrl+C para sair)")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+if __name__ == "__main__":
+    main()
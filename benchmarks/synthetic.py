@@ -0,0 +1,52 @@
+"""Decks e imagens sintéticos para os benchmarks (sem rede)."""
+import random
+from pathlib import Path
+from typing import List, Optional
+from src.core.models import DeckIR, DeckMeta, SlideIR, SlideType, ImageRef
+
+_WORDS = (
+    "dados modelo pipeline latência custo receita cliente produto mercado "
+    "escala nuvem equipe métrica risco estratégia resultado plataforma"
+).split()
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize()
+
+def make_images(directory: str, count: int, size=(1280, 720), seed: int = 0) -> List[str]:
+    """Gera `count` PNGs distintos (gradiente + ruído, próximos de uma saída real)."""
+    from PIL import Image
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        path = out / f"synthetic_{size[0]}x{size[1]}_{seed}_{i}.png"
+        if not path.exists():
+            base = Image.linear_gradient("L").resize(size).convert("RGB")
+            noise = Image.effect_noise(size, 40 + rng.randint(0, 40)).convert("RGB")
+            Image.blend(base, noise, 0.35).save(path)
+        paths.append(str(path))
+    return paths
+
+def make_deck(num_slides: int, image_paths: Optional[List[str]] = None, seed: int = 0,
+              bullets: int = 4) -> DeckIR:
+    """
+    Deck sintético. Se `image_paths` for informado, os slides usam essas
+    imagens em rodízio (repetições exercitam a deduplicação do renderer).
+    """
+    rng = random.Random(seed)
+    slides = []
+    for i in range(num_slides):
+        image = None
+        if image_paths:
+            path = image_paths[i % len(image_paths)]
+            image = ImageRef(status="ready", prompt=sentence(rng, 10), local_path=path)
+        slides.append(SlideIR(
+            id=f"s{i + 1}",
+            type=SlideType.TITLE_BULLETS,
+            title=sentence(rng, rng.randint(3, 9)),
+            bullets=[sentence(rng, rng.randint(4, 14)) for _ in range(bullets)],
+            image=image,
+            notes=sentence(rng, 20),
+        ))
+    return DeckIR(meta=DeckMeta(title="Deck sintético"), slides=slides)
@@ -1,27 +1,139 @@
 import os
+import sys
 import argparse
 from dotenv import load_dotenv
-from src.pipeline import run_pipeline
 
 # Carrega variáveis de ambiente do arquivo .env
 load_dotenv()
 
 def main():
     parser = argparse.ArgumentParser(description="SlideGen CLI - Gerador de Apresentações com IA")
-    parser.add_argument("--prompt", required=True, help="O tema ou instrução da apresentação")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--prompt", help="O tema ou instrução da apresentação")
+    source.add_argument("--batch", help="Manifesto JSONL/CSV com vários decks (prompt, context, output)")
+    source.add_argument("--serve", action="store_true", help="Sobe o servidor HTTP de decks (serviços ficam quentes entre pedidos)")
     parser.add_argument("--context", required=False, default="", help="Texto de base ou contexto")
+    parser.add_argument("--context-file", help="Arquivo de texto com o documento de apoio ('-' lê do stdin)")
     parser.add_argument("--output", default="output.pptx", help="Nome do arquivo de saída")
+    parser.add_argument("--image-workers", type=int, default=4, help="Gerações de imagem simultâneas")
+    parser.add_argument("--image-cache", default="output/cache/images", help="Diretório do cache de imagens ('' desativa)")
+    parser.add_argument("--llm-cache", default="output/cache/llm.sqlite", help="Arquivo SQLite do cache do LLM ('' desativa)")
+    parser.add_argument("--replay", action="store_true", help="Modo offline: usa apenas respostas já gravadas no cache do LLM")
+    parser.add_argument("--streaming", action="store_true", help="Imagens e render começam slide a slide, durante a geração do texto")
+    parser.add_argument("--no-optimize-images", action="store_true", help="Embute as imagens sem redimensionar/recomprimir")
+    parser.add_argument("--fanout", action="store_true", help="Planeja uma vez e escreve cada slide em paralelo")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Slides escritos em paralelo no modo fan-out")
+    parser.add_argument("--incremental", action="store_true", help="Refaz só os slides alterados desde o último build (manifesto <output>.build.json)")
+    parser.add_argument("--deck", help="DeckIR em JSON (ou manifesto de build) já pronto/editado: pula os estágios de LLM")
+    parser.add_argument("--no-qa", action="store_true", help="Não roda o QA editorial antes do render")
+    parser.add_argument("--no-image-validation", action="store_true", help="Não valida nem regera imagens reprovadas (lisas, escuras, duplicadas)")
+    parser.add_argument("--audiences", nargs="+", choices=["executivo", "técnico", "misto", "iniciante"],
+                        help="Uma versão do deck por público, com planejamento e imagens compartilhados")
+    parser.add_argument("--themes", nargs="+", choices=["default", "dark", "light"],
+                        help="Renderiza cada versão em cada tema (arquivos <output>_<público>_<tema>.pptx)")
+    parser.add_argument("--rpm", type=float, help="Limite de requisições por minuto do Groq")
+    parser.add_argument("--tpm", type=float, help="Limite de tokens por minuto do Groq")
+    parser.add_argument("--trace", help="Grava spans e contadores do pipeline neste arquivo JSON")
+    parser.add_argument("--metrics", help="Grava as métricas no formato texto do Prometheus")
+    parser.add_argument("--jobs", type=int, default=2, help="Decks simultâneos no modo batch")
+    parser.add_argument("--report", default="batch_report.json", help="Relatório JSON do modo batch")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço do modo servidor")
+    parser.add_argument("--port", type=int, default=8080, help="Porta do modo servidor")
+    parser.add_argument("--max-concurrent", type=int, default=2, help="Decks gerados ao mesmo tempo no modo servidor")
+    parser.add_argument("--max-queue", type=int, default=16, help="Decks aguardando na fila do modo servidor (acima disso: 429)")
     
     args = parser.parse_args()
     
     groq_key = os.getenv("GROQ_API_KEY")
     hf_token = os.getenv("HF_TOKEN")
     
-    if not groq_key:
+    if not groq_key and not args.replay:
         print("❌ Erro: GROQ_API_KEY não encontrada no .env")
         return
 
-    run_pipeline(args.prompt, args.context, args.output, groq_key, hf_token)
+    tracer = None
+    if args.trace or args.metrics:
+        from src.core.telemetry import Tracer, set_tracer
+        tracer = set_tracer(Tracer())
+
+    try:
+        _run(args, groq_key, hf_token)
+    finally:
+        if tracer:
+            if args.trace:
+                tracer.write_json(args.trace)
+                print(f"📈 Trace gravado em {args.trace}")
+            if args.metrics:
+                tracer.write_prometheus(args.metrics)
+                print(f"📈 Métricas gravadas em {args.metrics}")
+
+def _run(args, groq_key, hf_token):
+    if args.batch:
+        # Opções de um deck só não têm equivalente no manifesto
+        single = [flag for flag, value in (("--deck", args.deck), ("--context-file", args.context_file),
+                                           ("--audiences", args.audiences), ("--themes", args.themes)) if value]
+        if single:
+            print(f"❌ Erro: {', '.join(single)} não vale(m) no modo batch.")
+            return
+        from src.batch import load_manifest, run_batch
+        run_batch(load_manifest(args.batch), groq_key, hf_token, parallelism=args.jobs,
+                  report_path=args.report, max_image_workers=args.image_workers,
+                  image_cache_dir=args.image_cache, llm_cache_path=args.llm_cache, replay=args.replay,
+                  rpm=args.rpm, tpm=args.tpm, streaming=args.streaming,
+                  optimize_images=not args.no_optimize_images, fanout=args.fanout,
+                  llm_concurrency=args.llm_concurrency, incremental=args.incremental, qa=not args.no_qa,
+                  validate_images=not args.no_image_validation)
+        return
+    if args.serve:
+        from src.server import serve
+        serve(groq_key, hf_token, host=args.host, port=args.port, max_concurrent=args.max_concurrent,
+              max_queue=args.max_queue, max_image_workers=args.image_workers, image_cache_dir=args.image_cache,
+              llm_cache_path=args.llm_cache, replay=args.replay, rpm=args.rpm, tpm=args.tpm)
+        return
+
+    # Importado só depois da validação dos argumentos: mantém `--help` e erros de config rápidos
+    from src.pipeline import run_pipeline
+    if args.audiences or args.themes:
+        _run_variants(args, groq_key, hf_token)
+        return
+    deck = None
+    if args.deck:
+        from src.core.build import load_deck
+        deck = load_deck(args.deck)
+    context_stream = None
+    if args.context_file:
+        context_stream = sys.stdin if args.context_file == "-" else open(args.context_file, "r", encoding="utf-8")
+    try:
+        run_pipeline(args.prompt, args.context, args.output, groq_key, hf_token,
+                     max_image_workers=args.image_workers, image_cache_dir=args.image_cache,
+                     llm_cache_path=args.llm_cache, replay=args.replay, streaming=args.streaming,
+                     optimize_images=not args.no_optimize_images, context_stream=context_stream,
+                     fanout=args.fanout, llm_concurrency=args.llm_concurrency,
+                     incremental=args.incremental, deck=deck, qa=not args.no_qa,
+                     validate_images=not args.no_image_validation, rpm=args.rpm, tpm=args.tpm)
+    finally:
+        if context_stream is not None and context_stream is not sys.stdin:
+            context_stream.close()
+
+def _run_variants(args, groq_key, hf_token):
+    from src.core.models import AudienceType
+    from src.pipeline import run_variants
+    if args.deck or args.streaming or args.incremental or args.fanout:
+        print("⚠️ --audiences/--themes ignoram --deck, --streaming, --incremental e --fanout.")
+    context_stream = None
+    if args.context_file:
+        context_stream = sys.stdin if args.context_file == "-" else open(args.context_file, "r", encoding="utf-8")
+    try:
+        run_variants(args.prompt, args.context, args.output, groq_key, hf_token,
+                     audiences=[AudienceType(a) for a in args.audiences] if args.audiences else None,
+                     themes=args.themes, max_image_workers=args.image_workers,
+                     image_cache_dir=args.image_cache, llm_cache_path=args.llm_cache, replay=args.replay,
+                     context_stream=context_stream, llm_concurrency=args.llm_concurrency,
+                     optimize_images=not args.no_optimize_images, qa=not args.no_qa,
+                     validate_images=not args.no_image_validation, rpm=args.rpm, tpm=args.tpm)
+    finally:
+        if context_stream is not None and context_stream is not sys.stdin:
+            context_stream.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
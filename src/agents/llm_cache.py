@@ -0,0 +1,114 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Optional
+from src.core.telemetry import get_tracer
+
+class LLMCacheMiss(RuntimeError):
+    """Levantada no modo replay quando a resposta não está gravada no cache."""
+
+class LLMResponseCache:
+    """
+    Cache de respostas de LLM em SQLite, com TTL.
+
+    A chave é o hash de (modelo, parâmetros, mensagens). Como o CrewAI injeta
+    a saída da task anterior nas mensagens da próxima, a chave já cobre
+    (modelo, prompt renderizado da task, saída upstream): se o planejador
+    devolver o mesmo texto, o redator também acerta o cache, e assim por diante.
+    """
+
+    def __init__(self, path: str = "output/cache/llm.sqlite", ttl: Optional[float] = 7 * 24 * 3600):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, response TEXT, created_at REAL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: Any, params: Optional[dict] = None) -> str:
+        payload = json.dumps(
+            {"model": model, "params": params or {}, "messages": messages},
+            sort_keys=True, ensure_ascii=False, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and (self.ttl is None or time.time() - row[1] <= self.ttl):
+                self.hits += 1
+                get_tracer().incr("llm_cache_hits")
+                return row[0]
+            self.misses += 1
+            get_tracer().incr("llm_cache_misses")
+            return None
+
+    def put(self, key: str, model: str, response: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, response, time.time()),
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Remove entradas vencidas e retorna quantas foram apagadas."""
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+# Argumentos de `LLM.call` que não influenciam a resposta (objetos de runtime do CrewAI)
+_IGNORED_CALL_KWARGS = {"callbacks", "available_functions", "from_task", "from_agent"}
+
+def install_cache(llm, cache: LLMResponseCache, replay: bool = False):
+    """
+    Envolve `llm.call` com o cache, preservando o objeto LLM original
+    (o CrewAI exige uma instância de LLM nos agentes).
+
+    Args:
+        llm: Instância de `crewai.LLM`.
+        cache: Armazenamento das respostas.
+        replay: Se True, nunca chama a rede; uma falta no cache levanta LLMCacheMiss.
+    """
+    original_call = llm.call
+    model = getattr(llm, "model", "unknown")
+    params = {"temperature": getattr(llm, "temperature", None)}
+    if getattr(llm, "response_format", None):
+        # JSON mode muda a resposta: não compartilha entradas com o LLM comum
+        params["response_format"] = llm.response_format
+
+    def cached_call(messages, *args, **kwargs):
+        extra = {k: v for k, v in kwargs.items() if k not in _IGNORED_CALL_KWARGS and v is not None}
+        key = cache.make_key(model, messages, {**params, **extra})
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"   ♻️ Resposta do LLM reaproveitada do cache ({key[:10]}).")
+            return cached
+        if replay:
+            raise LLMCacheMiss(f"Modo replay: resposta não encontrada no cache ({key[:10]}).")
+        response = original_call(messages, *args, **kwargs)
+        if isinstance(response, str) and response.strip():
+            cache.put(key, model, response)
+        return response
+
+    # object.__setattr__ funciona tanto para classes simples quanto para modelos pydantic
+    object.__setattr__(llm, "call", cached_call)
+    return llm
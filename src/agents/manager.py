@@ -1,18 +1,137 @@
 import os
 import json
+import time
+import threading
 import traceback
 from pathlib import Path
-from crewai import Agent, Task, Crew, Process, LLM
-from src.core.models import DeckIR, ContextPack
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.core.models import AudienceType, DeckIR, ContextPack
+from src.agents.llm_cache import LLMResponseCache, install_cache
+from src.agents.streaming import StreamSubscription
+from src.agents.structured import JSON_MODE, StructuredDeckParser, deck_schema, slide_schema, validate_slide
+from src.core.retrieval import ContextIndex, iter_chunks, split_plan, estimate_tokens
+from src.core.telemetry import get_tracer
+from src.services.service_client import get_service
+
+# Orçamentos de contexto (tokens aproximados) enviados aos agentes
+STRATEGIST_SOURCE_TOKENS = 1000
+STRATEGIST_TOP_K = 4
+WRITER_SOURCE_TOKENS = 3000
+SLIDE_TOP_K = 3
+
+# Limites padrão do Groq para o llama-3.3-70b (plano gratuito); ajustáveis por CLI
+GROQ_RPM = 30
+GROQ_TPM = 12000
+# Reserva de tokens de saída por chamada, somada à estimativa do prompt
+EXPECTED_OUTPUT_TOKENS = 600
+# Tentativas de formatar um slide isolado antes de cair no fallback do plano
+SLIDE_FORMAT_ATTEMPTS = 2
+
+# Orientação de redação/revisão por público nas variantes do deck
+AUDIENCE_GUIDANCE = {
+    AudienceType.EXECUTIVE: "Foque em impacto, decisões, custos, riscos e resultados; evite jargão e detalhes de implementação.",
+    AudienceType.TECHNICAL: "Seja preciso: arquitetura, métricas, trade-offs e termos técnicos corretos, sem simplificar demais.",
+    AudienceType.BEGINNER: "Explique os conceitos do zero, com analogias simples e sem siglas não explicadas.",
+    AudienceType.MIXED: "Equilibre visão geral e detalhe técnico, explicando os termos essenciais.",
+}
 
 class SlideCrewManager:
-    def __init__(self, api_key: str):
-        self.llm = LLM(
+    def __init__(self, api_key: Optional[str], llm_cache: Optional[LLMResponseCache] = None, replay: bool = False,
+                 llm=None, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        """
+        Args:
+            llm: LLM já construído (ex.: dublê local nos benchmarks). Se omitido,
+                usa o Groq com `api_key`.
+            rpm, tpm: Limites do provedor; todas as chamadas que não vêm do cache
+                passam pelo cliente compartilhado do Groq (limitador, retries
+                com backoff e circuit breaker), inclusive as do modo fan-out.
+                O cliente é do processo: `None` mantém o limite em vigor
+                (GROQ_RPM/GROQ_TPM na criação, ou o que outro deck definiu)
+                e 0 desliga o limite.
+        """
+        if replay and not llm_cache:
+            raise ValueError("Modo replay exige um cache de LLM.")
+        self.api_key = api_key
+        self.llm_cache = llm_cache
+        self.replay = replay
+        self.service = get_service("groq", rpm=GROQ_RPM, tpm=GROQ_TPM)
+        if rpm is not None or tpm is not None:
+            self.service.set_limits(rpm=rpm, tpm=tpm)
+        self._custom_llm = llm
+        self.llm = self._wrap_llm(llm) if llm is not None else self._build_llm()
+        # Formatação estruturada (JSON mode); com LLM injetado é a mesma instância
+        self.json_llm = self._build_llm(json_mode=True)
+        self.prompts_dir = Path(__file__).parent / "prompts"
+
+    def _build_llm(self, stream: bool = False, json_mode: bool = False):
+        if self._custom_llm is not None:
+            # LLM injetado não é reconstruído (já foi embrulhado no __init__):
+            # streaming cai no caminho pós-chamada e o JSON mode fica a cargo do dublê
+            return self._custom_llm
+        # crewai é pesado (~segundos de import): carregado só quando o estágio de texto roda
+        from crewai import LLM
+        llm_kwargs = {}
+        if stream:
+            llm_kwargs["stream"] = True
+        if json_mode:
+            llm_kwargs["response_format"] = JSON_MODE
+        llm = LLM(
             model="groq/llama-3.3-70b-versatile",
-            api_key=api_key,
-            temperature=0.0
+            api_key=self.api_key,
+            temperature=0.0,
+            **llm_kwargs
         )
-        self.prompts_dir = Path(__file__).parent / "prompts"
+        return self._wrap_llm(llm)
+
+    def _wrap_llm(self, llm):
+        # Ordem importa: o limitador fica por dentro do cache (hits não consomem cota)
+        self._rate_limit_llm(llm)
+        if self.llm_cache:
+            install_cache(llm, self.llm_cache, replay=self.replay)
+        self._instrument_llm(llm)
+        return llm
+
+    def _rate_limit_llm(self, llm):
+        """Cada chamada real ao provedor passa por RPM/TPM, retries com backoff e circuit breaker."""
+        inner_call = llm.call
+        service = self.service
+
+        def limited_call(messages, *args, **kwargs):
+            text = messages if isinstance(messages, str) else " ".join(
+                str(m.get("content", "")) if isinstance(m, dict) else str(m) for m in messages)
+            return service.call(inner_call, messages, *args,
+                                tokens=estimate_tokens(text) + EXPECTED_OUTPUT_TOKENS, **kwargs)
+
+        object.__setattr__(llm, "call", limited_call)
+
+    def _instrument_llm(self, llm):
+        """Registra latência de cada chamada ao LLM (por agente) no tracer global."""
+        inner_call = llm.call
+
+        def timed_call(messages, *args, **kwargs):
+            tracer = get_tracer()
+            if not tracer.enabled:
+                return inner_call(messages, *args, **kwargs)
+            agent = getattr(kwargs.get("from_agent"), "role", None) or "desconhecido"
+            start = time.perf_counter()
+            with tracer.span("llm.call", agent=agent):
+                response = inner_call(messages, *args, **kwargs)
+            tracer.incr("llm_calls", agent=agent)
+            tracer.incr("llm_latency_seconds", time.perf_counter() - start, agent=agent)
+            return response
+
+        object.__setattr__(llm, "call", timed_call)
+
+    def _record_token_usage(self, result):
+        usage = getattr(result, "token_usage", None)
+        if usage is None:
+            return
+        tracer = get_tracer()
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens", "successful_requests"):
+            value = getattr(usage, field, None)
+            if value:
+                tracer.incr(f"llm_{field}", value)
 
     def _load_prompt(self, filename: str, **kwargs) -> str:
         try:
@@ -23,6 +142,14 @@ class SlideCrewManager:
             print(f"⚠️ Erro ao carregar prompt {filename}: {e}")
             return ""
 
+    @staticmethod
+    def _extract_json(text: str) -> dict:
+        # Limpeza básica
+        json_str = text.replace("```json", "").replace("```", "").strip()
+        start = json_str.find("{"); end = json_str.rfind("}")
+        if start != -1 and end != -1: json_str = json_str[start:end+1]
+        return json.loads(json_str)
+
     def _heal_json_structure(self, data: dict) -> dict:
         """
         Tenta consertar JSONs mal formados pelo LLM.
@@ -77,43 +204,295 @@ class SlideCrewManager:
         print(f"   🚑 Recuperados {len(new_data['slides'])} slides da estrutura quebrada.")
         return new_data
 
-    def run_crew(self, context: ContextPack) -> DeckIR:
-        # Agentes (Definição igual)
+    def _build_index(self, context: ContextPack) -> ContextIndex:
+        chunks = context.chunks or list(iter_chunks(context.cleaned_text or ""))
+        with get_tracer().span("context.index", chunks=len(chunks)):
+            return ContextIndex(chunks)
+
+    def plan(self, context: ContextPack, index: Optional[ContextIndex] = None) -> str:
+        """Roda só o Planejador e devolve o roteiro em texto (Slide 1..N)."""
+        from crewai import Agent, Task, Crew
+
+        index = index or self._build_index(context)
+        num_slides = context.meta.get('num_slides', 5)
+        source = index.select(context.prompt, k=STRATEGIST_TOP_K, token_budget=STRATEGIST_SOURCE_TOKENS)
+
         strategist = Agent(role='Planejador', goal='Estrutura.', backstory="Estrategista.", llm=self.llm, allow_delegation=False)
+        plan_task = Task(description=self._load_prompt("strategist.md", num_slides=num_slides, user_prompt=context.prompt, source_text=source), expected_output="Lista.", agent=strategist)
+        result = Crew(agents=[strategist], tasks=[plan_task], verbose=True).kickoff()
+        self._record_token_usage(result)
+        return result.raw if hasattr(result, 'raw') else str(result)
+
+    def _source_excerpts(self, index: ContextIndex, prompt: str, plan_text: str, num_slides: int) -> str:
+        """Top-k trechos do documento para cada slide planejado, dentro do orçamento de tokens."""
+        if not index.chunks:
+            return "(sem documento de apoio)"
+        per_slide_budget = max(200, WRITER_SOURCE_TOKENS // max(1, num_slides))
+        blocks = []
+        for i, section in enumerate(split_plan(plan_text, num_slides), start=1):
+            text = index.select(f"{prompt} {section}", k=SLIDE_TOP_K, token_budget=per_slide_budget)
+            blocks.append(f"### Slide {i}\n{text}")
+        return "\n\n".join(blocks)
+
+    def run_crew(self, context: ContextPack, on_slide: Optional[Callable[[int, dict], None]] = None) -> DeckIR:
+        """
+        Executa a crew e devolve o DeckIR.
+
+        A formatação não é um agente: é uma chamada direta ao LLM com o JSON
+        Schema do DeckIR (em JSON mode quando o provedor suporta). Cada slide é
+        validado assim que fecha; só os inválidos ou ausentes são pedidos de
+        novo, um a um, sem rodar a crew outra vez.
+
+        Se `on_slide` for informado, o formatador roda com streaming e cada
+        slide válido é entregue como dict `(índice, slide)` assim que seu
+        objeto JSON fecha (modo streaming do pipeline).
+        """
+        num_slides = context.meta.get('num_slides', 5)
+        index = self._build_index(context)
+
+        # Fase 1: planejamento, com os trechos mais relevantes para o tema
+        plan_text = self.plan(context, index)
+        source_excerpts = self._source_excerpts(index, context.prompt, plan_text, num_slides)
+        return self.write_deck(context, plan_text, source_excerpts, on_slide=on_slide)
+
+    def write_deck(self, context: ContextPack, plan_text: str, source_excerpts: str,
+                   audience: Optional[AudienceType] = None,
+                   on_slide: Optional[Callable[[int, dict], None]] = None) -> DeckIR:
+        """
+        Fases 2 e 3 sobre um plano pronto: redação → revisão → formatação.
+        Com `audience`, redator e revisor recebem a orientação do público e o
+        DeckIR sai com `meta.audience` igual a ele.
+        """
+        from crewai import Agent, Task, Crew
+
+        num_slides = context.meta.get('num_slides', 5)
+        audience_note = self._audience_note(audience, num_slides) if audience else ""
+
+        # Fase 2: redação → revisão, com trechos recuperados por slide
         writer = Agent(role='Redator', goal='Conteúdo denso.', backstory="Escritor técnico.", llm=self.llm, allow_delegation=False)
-        formatter = Agent(role='Formatador', goal='JSON.', backstory="Dev.", llm=self.llm, allow_delegation=False)
         reviewer = Agent(role='Editor Visual', goal='Concisão.', backstory="Editor.", llm=self.llm, allow_delegation=False)
 
+        write_task = Task(description=self._load_prompt("writer.md", num_slides=num_slides, plan=plan_text, source_excerpts=source_excerpts) + audience_note, expected_output="Texto.", agent=writer)
+        review_task = Task(description=self._load_prompt("reviewer.md", num_slides=num_slides) + audience_note, expected_output="Texto revisado.", agent=reviewer, context=[write_task])
+
+        result = Crew(agents=[writer, reviewer], tasks=[write_task, review_task], verbose=True).kickoff()
+        self._record_token_usage(result)
+        review_text = result.raw if hasattr(result, 'raw') else str(result)
+
+        # Fase 3: formatação estruturada
+        with get_tracer().span("llm.format", slides=num_slides, streaming=bool(on_slide)):
+            slides, meta = self._format_deck(review_text, context, plan_text, num_slides, on_slide)
+        if audience:
+            meta = {**meta, "audience": audience.value}
+        return DeckIR(meta=meta, slides=slides)
+
+    def _audience_note(self, audience: AudienceType, num_slides: int) -> str:
+        return self._load_prompt("audience.md", audience=audience.value, num_slides=num_slides,
+                                 guidance=AUDIENCE_GUIDANCE.get(audience, ""))
+
+    def run_variants(self, context: ContextPack, audiences: List[AudienceType],
+                     max_concurrency: Optional[int] = None) -> Dict[AudienceType, DeckIR]:
+        """
+        Uma versão do deck por público a partir de um único planejamento.
+
+        Índice do contexto, Planejador e trechos por slide rodam uma vez; só
+        redação, revisão e formatação se repetem, uma crew por público em
+        paralelo (o limitador do Groq segura a cota). Um público que falhar
+        fica fora do resultado sem derrubar os outros.
+        """
         num_slides = context.meta.get('num_slides', 5)
-        clean_source = context.cleaned_text[:2000]
+        index = self._build_index(context)
+        with get_tracer().span("crew.plan", audiences=len(audiences)):
+            plan_text = self.plan(context, index)
+            source_excerpts = self._source_excerpts(index, context.prompt, plan_text, num_slides)
 
-        # Tasks
-        plan_task = Task(description=self._load_prompt("strategist.md", num_slides=num_slides, user_prompt=context.prompt, source_text=clean_source), expected_output="Lista.", agent=strategist)
-        write_task = Task(description=self._load_prompt("writer.md", num_slides=num_slides), expected_output="Texto.", agent=writer, context=[plan_task])
-        review_task = Task(description=self._load_prompt("reviewer.md", num_slides=num_slides), expected_output="Texto revisado.", agent=reviewer, context=[write_task])
-        format_task = Task(description=self._load_prompt("formatter.md"), expected_output="JSON.", agent=formatter, context=[review_task])
+        print(f"   🧵 Variantes: {len(audiences)} públicos sobre o mesmo plano.")
+        decks = {}
+        workers = max(1, max_concurrency or len(audiences))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="variantcrew") as pool:
+            futures = {pool.submit(self._write_variant, context, plan_text, source_excerpts, a): a for a in audiences}
+            for future in as_completed(futures):
+                audience = futures[future]
+                try:
+                    decks[audience] = future.result()
+                except Exception as e:
+                    print(f"   ⚠️ Variante '{audience.value}' falhou ({e}).")
+                    get_tracer().incr("variant_errors")
+        # Ordem pedida, não a de conclusão
+        return {a: decks[a] for a in audiences if a in decks}
 
-        crew = Crew(agents=[strategist, writer, reviewer, formatter], tasks=[plan_task, write_task, review_task, format_task], verbose=True)
-        result = crew.kickoff()
-        
-        try:
-            if hasattr(result, 'raw'): json_str = result.raw
-            else: json_str = str(result)
-            
-            # Limpeza básica
-            json_str = json_str.replace("```json", "").replace("```", "").strip()
-            start = json_str.find("{"); end = json_str.rfind("}")
-            if start != -1 and end != -1: json_str = json_str[start:end+1]
-            
-            raw_data = json.loads(json_str)
-            
-            # --- AQUI ENTRA A CURA ---
-            healed_data = self._heal_json_structure(raw_data)
-            
-            return DeckIR(**healed_data)
+    def _write_variant(self, context: ContextPack, plan_text: str, source_excerpts: str, audience: AudienceType) -> DeckIR:
+        with get_tracer().span("crew.variant", audience=audience.value):
+            return self.write_deck(context, plan_text, source_excerpts, audience=audience)
 
+    def _call_json(self, llm, system: str, user: str) -> str:
+        """Chamada direta ao LLM (fora da crew) para as etapas de formatação."""
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
+        try:
+            return str(llm.call(messages))
         except Exception as e:
-            print(f"❌ [ERRO MANAGER]: {e}")
-            # Se falhar muito feio, retorna um deck vazio para não crashar o pipeline inteiro
-            # return DeckIR(meta={"title": "Error", "audience": "misto", "theme_id": "default"}, slides=[])
-            raise e
\ No newline at end of file
+            if llm is self.llm or "response_format" not in str(e).lower():
+                raise
+            # Versões do LiteLLM/modelo sem JSON mode: o schema no prompt continua valendo
+            print("   ⚠️ Provedor recusou o JSON mode; seguindo só com o schema no prompt.")
+            self.json_llm = self.llm
+            return str(self.llm.call(messages))
+
+    def _format_deck(self, review_text: str, context: ContextPack, plan_text: str, num_slides: int,
+                     on_slide: Optional[Callable[[int, dict], None]] = None):
+        """Formata o deck inteiro numa chamada e re-pede só os slides que falharem na validação."""
+        system = self._load_prompt("formatter.md", num_slides=num_slides, schema=deck_schema())
+        emitted = set()
+        emit_lock = threading.Lock()
+
+        def _emit(pairs):
+            if not on_slide:
+                return
+            for i, slide in pairs:
+                if i not in emitted:
+                    emitted.add(i)
+                    on_slide(i, slide)
+
+        if on_slide:
+            # LLM próprio: o filtro de eventos usa a identidade da instância.
+            # Sem JSON mode aqui (o Groq não combina JSON mode com streaming).
+            format_llm = self._build_llm(stream=True)
+            stream_parser = StructuredDeckParser(num_slides)
+
+            def _on_chunk(chunk: str):
+                # Handlers do barramento podem rodar fora da thread da chamada
+                with emit_lock:
+                    _emit(stream_parser.feed(chunk))
+
+            subscription = StreamSubscription(format_llm, _on_chunk)
+            try:
+                text = self._call_json(format_llm, system, review_text)
+            finally:
+                subscription.close()
+        else:
+            text = self._call_json(self.json_llm, system, review_text)
+
+        # O texto completo é a fonte da verdade; o stream só antecipa slides
+        # (e não vê nada quando a resposta vem do cache)
+        parser = StructuredDeckParser(num_slides)
+        with emit_lock:
+            _emit(parser.feed(text))
+        meta = parser.meta(context.prompt[:80])
+
+        if not parser.found_slides:
+            try:
+                healed = self._heal_json_structure(self._extract_json(text))
+                meta = healed.get("meta") or meta
+                with emit_lock:
+                    _emit(filter(None, (parser.accept(raw) for raw in healed.get("slides", []))))
+            except Exception as e:
+                print(f"   ⚠️ Resposta do formatador sem JSON aproveitável ({e}).")
+
+        pending = parser.pending()
+        if pending:
+            print(f"   🔁 {len(pending)} slide(s) inválido(s) ou ausente(s): pedindo só esses de novo.")
+            get_tracer().incr("llm_slide_reasks", len(pending))
+        sections = split_plan(plan_text, num_slides)
+        for i in pending:
+            try:
+                slide = self._format_slide(review_text, i, num_slides, parser.errors.get(i, "slide ausente na resposta"))
+            except Exception as e:
+                print(f"   ⚠️ Slide {i + 1} continua inválido ({e}). Usando o plano como conteúdo.")
+                slide = self._slide_from_plan(sections[i], i)
+            parser.set_slide(i, slide)
+            with emit_lock:
+                _emit([(i, slide)])
+
+        return [s for s in parser.slides if s is not None], meta
+
+    def _format_slide(self, review_text: str, i: int, num_slides: int, error: Optional[str] = None) -> dict:
+        """
+        Formata um único slide com o schema do SlideIR, devolvendo ao modelo o
+        erro da tentativa anterior. Levanta ValueError se nenhuma tentativa validar.
+        """
+        system = self._load_prompt("slide_formatter.md", slide_id=f"s{i + 1}", slide_number=i + 1,
+                                   num_slides=num_slides, schema=slide_schema())
+        for attempt in range(1, SLIDE_FORMAT_ATTEMPTS + 1):
+            user = review_text
+            if error:
+                # O número da tentativa também muda a chave do cache de LLM
+                user += f"\n\n[Tentativa {attempt}] A resposta anterior para o slide {i + 1} foi rejeitada: {error}"
+            text = self._call_json(self.json_llm, system, user)
+            try:
+                raw = self._extract_json(text)
+            except json.JSONDecodeError as e:
+                error = f"JSON inválido ({e.msg})"
+                continue
+            slide, error = validate_slide(raw, i)
+            if slide:
+                return slide
+        raise ValueError(error)
+
+    # --- Modo fan-out: um pipeline curto por slide, em paralelo ---
+
+    def run_fanout(self, context: ContextPack, max_concurrency: int = 4,
+                   on_slide: Optional[Callable[[int, dict], None]] = None) -> DeckIR:
+        """
+        Planeja o deck uma vez e escreve/revisa/formata cada slide numa crew
+        própria, com até `max_concurrency` slides em paralelo. O limitador de
+        RPM/TPM do manager segura as chamadas quando a cota do Groq aperta.
+
+        A latência passa a ser ~ (planejamento + 1 slide) em vez de crescer com
+        o número de slides, e cada resposta JSON fica pequena.
+        """
+        num_slides = context.meta.get('num_slides', 5)
+        index = self._build_index(context)
+        plan_text = self.plan(context, index)
+        sections = split_plan(plan_text, num_slides)
+        per_slide_budget = max(200, WRITER_SOURCE_TOKENS // max(1, num_slides))
+
+        def _job(i: int) -> dict:
+            section = sections[i] or f"Slide {i + 1} de {num_slides} sobre: {context.prompt}"
+            excerpts = index.select(f"{context.prompt} {section}", k=SLIDE_TOP_K, token_budget=per_slide_budget) \
+                if index.chunks else "(sem documento de apoio)"
+            with get_tracer().span("crew.slide", slide=i + 1):
+                data = self._run_slide_crew(context, plan_text, section, excerpts, i, num_slides)
+            if on_slide:
+                on_slide(i, data)
+            return data
+
+        print(f"   🧵 Fan-out: {num_slides} slides, {max_concurrency} em paralelo.")
+        slides = [None] * num_slides
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="slidecrew") as pool:
+            futures = {pool.submit(_job, i): i for i in range(num_slides)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    slides[i] = future.result()
+                except Exception as e:
+                    print(f"   ⚠️ Slide {i + 1} falhou no fan-out ({e}). Usando o plano como conteúdo.")
+                    slides[i] = self._slide_from_plan(sections[i], i)
+
+        meta = {"title": context.prompt[:80], "audience": context.meta.get("audience", "misto"), "theme_id": "default"}
+        return DeckIR(meta=meta, slides=slides)
+
+    def _run_slide_crew(self, context: ContextPack, plan_text: str, section: str, excerpts: str,
+                        i: int, num_slides: int) -> dict:
+        from crewai import Agent, Task, Crew
+
+        writer = Agent(role='Redator', goal='Conteúdo denso.', backstory="Escritor técnico.", llm=self.llm, allow_delegation=False)
+        reviewer = Agent(role='Editor Visual', goal='Concisão.', backstory="Editor.", llm=self.llm, allow_delegation=False)
+
+        write_task = Task(description=self._load_prompt("slide_writer.md", slide_number=i + 1, num_slides=num_slides, user_prompt=context.prompt, plan=plan_text, slide_plan=section, source_excerpts=excerpts), expected_output="Texto.", agent=writer)
+        review_task = Task(description=self._load_prompt("reviewer.md", num_slides=1), expected_output="Texto revisado.", agent=reviewer, context=[write_task])
+
+        result = Crew(agents=[writer, reviewer], tasks=[write_task, review_task], verbose=False).kickoff()
+        self._record_token_usage(result)
+        # Slide que não valida nem após o re-pedido cai no fallback do plano
+        return self._format_slide(result.raw if hasattr(result, 'raw') else str(result), i, num_slides)
+
+    @staticmethod
+    def _slide_from_plan(section: str, i: int) -> dict:
+        lines = [l.strip(" -*:#") for l in (section or "").splitlines() if l.strip(" -*:#")]
+        return {
+            "id": f"s{i + 1}",
+            "type": "TITLE_BULLETS",
+            "title": lines[0] if lines else f"Slide {i + 1}",
+            "bullets": lines[1:6],
+            "image": {"status": "missing"},
+        }
@@ -0,0 +1,113 @@
+import re
+import json
+import weakref
+import threading
+from typing import Callable, List, Optional
+
+_SLIDES_ARRAY = re.compile(r'"slides"\s*:\s*\[')
+_SEPARATORS = " \t\r\n,"
+
+class SlideStreamParser:
+    """
+    Parser incremental do JSON do formatador.
+
+    Recebe o texto em pedaços (tokens do LLM) e devolve cada objeto da lista
+    `slides` assim que ele fecha, sem esperar o JSON completo.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos: Optional[int] = None
+        self._decoder = json.JSONDecoder()
+        self.done = False
+        self.count = 0
+
+    def feed(self, chunk: str) -> List[dict]:
+        slides = []
+        if self.done or not chunk:
+            return slides
+        self._buf += chunk
+
+        if self._pos is None:
+            match = _SLIDES_ARRAY.search(self._buf)
+            if not match:
+                return slides
+            self._pos = match.end()
+
+        buf = self._buf
+        while True:
+            i = self._pos
+            while i < len(buf) and buf[i] in _SEPARATORS:
+                i += 1
+            if i >= len(buf):
+                break
+            if buf[i] == "]":
+                self.done = True
+                break
+            try:
+                obj, end = self._decoder.raw_decode(buf, i)
+            except json.JSONDecodeError:
+                # Objeto ainda incompleto: espera o próximo pedaço
+                break
+            self._pos = end
+            if isinstance(obj, dict):
+                slides.append(obj)
+                self.count += 1
+        return slides
+
+def _event_bus():
+    """Localiza o barramento de eventos do CrewAI (o caminho mudou entre versões)."""
+    try:
+        from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+    except ImportError:
+        try:
+            from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+        except ImportError:
+            return None, None
+    return crewai_event_bus, LLMStreamChunkEvent
+
+# Um único handler por processo no barramento do CrewAI, que repassa os chunks
+# às assinaturas abertas. Versões do barramento sem `off` não deixam remover
+# handlers: registrar um por assinatura vazaria um handler por deck (servidor).
+_subscriptions: "weakref.WeakSet[StreamSubscription]" = weakref.WeakSet()
+_subscriptions_lock = threading.Lock()
+_dispatcher_installed = False
+
+def _dispatch(source, event):
+    with _subscriptions_lock:
+        targets = [sub for sub in _subscriptions if sub.active and source is sub.llm]
+    for sub in targets:
+        sub.on_chunk(getattr(event, "chunk", "") or "")
+
+class StreamSubscription:
+    """
+    Encaminha os chunks de streaming de UMA instância de LLM para um callback.
+
+    O filtro por `source` garante que só a saída do formatador é analisada,
+    mesmo com outros decks rodando em paralelo no mesmo processo. `close()`
+    tira a assinatura do despachante (e uma assinatura esquecida some com o
+    garbage collector, pelo WeakSet).
+    """
+
+    def __init__(self, llm, on_chunk: Callable[[str], None]):
+        global _dispatcher_installed
+        self.llm = llm
+        self.on_chunk = on_chunk
+        self.active = False
+        bus, event_type = _event_bus()
+
+        if bus is None:
+            print("   ⚠️ Barramento de eventos do CrewAI indisponível: streaming só após o fim da crew.")
+            return
+
+        with _subscriptions_lock:
+            if not _dispatcher_installed:
+                bus.on(event_type)(_dispatch)
+                _dispatcher_installed = True
+            _subscriptions.add(self)
+        self.active = True
+
+    def close(self):
+        self.active = False
+        with _subscriptions_lock:
+            _subscriptions.discard(self)
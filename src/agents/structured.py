@@ -0,0 +1,160 @@
+import re
+import json
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from src.core.models import DeckIR, DeckMeta, SlideIR, SlideType
+from src.agents.streaming import SlideStreamParser
+
+# JSON mode (Groq/OpenAI): o provedor garante um objeto JSON sintaticamente válido
+JSON_MODE = {"type": "json_object"}
+
+_META_KEY = re.compile(r'"meta"\s*:\s*')
+
+@lru_cache(maxsize=None)
+def deck_schema() -> str:
+    """JSON Schema do DeckIR, compacto para caber no prompt do formatador."""
+    return json.dumps(DeckIR.model_json_schema(), ensure_ascii=False, separators=(",", ":"))
+
+@lru_cache(maxsize=None)
+def slide_schema() -> str:
+    return json.dumps(SlideIR.model_json_schema(), ensure_ascii=False, separators=(",", ":"))
+
+def _describe(error: ValidationError, limit: int = 3) -> str:
+    """Resumo curto dos erros do pydantic, para devolver ao modelo no re-pedido."""
+    parts = []
+    for err in error.errors()[:limit]:
+        loc = ".".join(str(p) for p in err.get("loc", ())) or "slide"
+        parts.append(f"{loc}: {err.get('msg', 'inválido')}")
+    return "; ".join(parts)
+
+# Chaves que o modelo costuma usar no lugar das do SlideIR (comparadas em minúsculas)
+KEY_ALIASES = {
+    "título": "title", "titulo": "title", "heading": "title", "cabeçalho": "title",
+    "subtítulo": "subtitle", "subtitulo": "subtitle",
+    "conteúdo": "bullets", "conteudo": "bullets", "content": "bullets", "texto": "bullets", "text": "bullets",
+    "tópicos": "bullets", "topicos": "bullets", "pontos": "bullets", "itens": "bullets", "items": "bullets",
+    "points": "bullets", "bullet_points": "bullets",
+    "colunas": "columns", "imagem": "image", "legenda": "caption",
+    "notas": "notes", "speaker_notes": "notes", "tipo": "type",
+}
+_FIELDS = set(SlideIR.model_fields)
+
+def _normalize_keys(data: dict) -> Tuple[dict, List[str]]:
+    """Mapeia chaves alternativas para as do SlideIR; devolve (dados, chaves_desconhecidas)."""
+    out, unknown = {}, []
+    for key, value in data.items():
+        name = key if key in _FIELDS else KEY_ALIASES.get(str(key).strip().lower())
+        if name is None:
+            unknown.append(key)
+        elif name not in out:
+            out[name] = value
+    if isinstance(out.get("bullets"), str):
+        out["bullets"] = [out["bullets"]]
+    return out, unknown
+
+def _missing_content(slide: SlideIR) -> Optional[str]:
+    """Motivo de um slide válido no schema estar vazio para o seu tipo (None se ok)."""
+    if not slide.title.strip():
+        return "title: obrigatório e não vazio"
+    if slide.type == SlideType.TITLE_BULLETS and not any(b.strip() for b in slide.bullets or []):
+        return "bullets: ao menos um bullet não vazio"
+    if slide.type == SlideType.TWO_COLUMNS and not (slide.columns and (slide.columns.left or slide.columns.right)):
+        return "columns: ao menos uma coluna com itens"
+    if slide.type == SlideType.IMAGE_CAPTION and not ((slide.image and slide.image.prompt) or slide.caption):
+        return "image.prompt ou caption: obrigatório em IMAGE_CAPTION"
+    return None
+
+def validate_slide(data, index: int) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Valida um slide contra o SlideIR e exige conteúdo para o tipo.
+
+    O id é sempre reescrito pela posição (o modelo costuma repetir ou pular
+    ids) e o tipo padrão é TITLE_BULLETS. Chaves alternativas conhecidas
+    ("Título", "conteudo"...) são mapeadas; as desconhecidas são descartadas
+    e citadas no motivo quando o slide fica sem conteúdo.
+
+    Returns:
+        (slide_normalizado, None) se válido, senão (None, motivo).
+    """
+    if isinstance(data, dict) and isinstance(data.get("slides"), list) and data["slides"]:
+        # O modelo às vezes embrulha o slide num deck completo
+        data = data["slides"][0]
+    if not isinstance(data, dict):
+        return None, "o slide não é um objeto JSON"
+    data, unknown = _normalize_keys(data)
+    data["id"] = f"s{index + 1}"
+    data.setdefault("type", "TITLE_BULLETS")
+    try:
+        slide = SlideIR.model_validate(data)
+    except ValidationError as e:
+        return None, _describe(e)
+    missing = _missing_content(slide)
+    if missing:
+        if unknown:
+            missing += f" (chaves fora do schema: {', '.join(map(str, unknown[:5]))})"
+        return None, missing
+    return slide.model_dump(mode="json"), None
+
+class StructuredDeckParser:
+    """
+    Valida os slides do formatador à medida que chegam.
+
+    Usa o SlideStreamParser para fechar cada objeto da lista `slides` e
+    valida cada um isoladamente: um slide ruim não invalida o deck, só entra
+    na lista `pending()` para ser pedido de novo.
+    """
+
+    def __init__(self, expected: int):
+        self.expected = expected
+        self.text = ""
+        self.slides: List[Optional[dict]] = []
+        self.errors: Dict[int, str] = {}
+        self._stream = SlideStreamParser()
+
+    def feed(self, chunk: str) -> List[Tuple[int, dict]]:
+        """Devolve (índice, slide) dos slides válidos que fecharam neste pedaço."""
+        self.text += chunk or ""
+        valid = []
+        for raw in self._stream.feed(chunk):
+            accepted = self.accept(raw)
+            if accepted:
+                valid.append(accepted)
+        return valid
+
+    def accept(self, raw) -> Optional[Tuple[int, dict]]:
+        """Valida o próximo slide da sequência; devolve (índice, slide) se válido."""
+        index = len(self.slides)
+        slide, error = validate_slide(raw, index)
+        self.slides.append(slide)
+        if error:
+            self.errors[index] = error
+            return None
+        return index, slide
+
+    @property
+    def found_slides(self) -> bool:
+        """False quando o texto nem tem a lista `slides` (estrutura quebrada)."""
+        return bool(self.slides) or self._stream.done
+
+    def pending(self) -> List[int]:
+        """Índices a pedir de novo: inválidos ou que não chegaram."""
+        invalid = [i for i in sorted(self.errors) if i < self.expected]
+        return invalid + list(range(len(self.slides), self.expected))
+
+    def meta(self, fallback_title: str) -> dict:
+        """Extrai `meta` sem exigir que o resto do JSON seja válido."""
+        match = _META_KEY.search(self.text)
+        if match:
+            try:
+                obj, _ = json.JSONDecoder().raw_decode(self.text, match.end())
+                return DeckMeta.model_validate(obj).model_dump(mode="json")
+            except (json.JSONDecodeError, ValidationError, TypeError):
+                pass
+        return {"title": fallback_title, "audience": "misto", "theme_id": "default"}
+
+    def set_slide(self, index: int, slide: dict):
+        while len(self.slides) <= index:
+            self.slides.append(None)
+        self.slides[index] = slide
+        self.errors.pop(index, None)
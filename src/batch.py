@@ -0,0 +1,99 @@
+import csv
+import json
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional
+from pydantic import BaseModel
+from src.pipeline import run_pipeline, build_manager, build_image_service
+
+class BatchJob(BaseModel):
+    """Uma linha do manifesto de batch."""
+    prompt: str
+    context: str = ""
+    output: str
+
+class BatchResult(BaseModel):
+    index: int
+    prompt: str
+    output: str
+    status: str  # 'ok' ou 'failed'
+    seconds: float
+    error: Optional[str] = None
+
+def load_manifest(path: str) -> List[BatchJob]:
+    """
+    Lê um manifesto JSONL (um objeto por linha) ou CSV (com cabeçalho
+    prompt,context,output). Jobs sem `output` recebem `deck_<n>.pptx`.
+    """
+    manifest = Path(path)
+    rows = []
+    with open(manifest, "r", encoding="utf-8") as f:
+        if manifest.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    jobs = []
+    for i, row in enumerate(rows, start=1):
+        row = {k: v for k, v in row.items() if v not in (None, "")}
+        row.setdefault("output", f"deck_{i}.pptx")
+        jobs.append(BatchJob(**row))
+    return jobs
+
+def run_batch(jobs: List[BatchJob], groq_key: str, hf_token: str = None, parallelism: int = 2,
+              report_path: Optional[str] = None, max_image_workers: int = 4,
+              image_cache_dir: str = "output/cache/images",
+              llm_cache_path: str = "output/cache/llm.sqlite", replay: bool = False,
+              rpm: Optional[float] = None, tpm: Optional[float] = None, **options) -> List[BatchResult]:
+    """
+    Executa vários decks no mesmo processo.
+
+    O gerenciador da crew (LLM + cache) e o serviço de imagens são criados uma
+    única vez e compartilhados por todos os jobs, que rodam em paralelo até
+    `parallelism` por vez. `rpm`/`tpm` valem para o batch inteiro (o cliente
+    do Groq é compartilhado) e `options` (streaming, fanout, qa...) seguem
+    para o `run_pipeline` de cada job.
+    """
+    print(f"📚 Batch: {len(jobs)} decks ({parallelism} em paralelo)")
+    manager = build_manager(groq_key, llm_cache_path, replay, rpm=rpm, tpm=tpm)
+    img_gen = build_image_service(hf_token, image_cache_dir)
+
+    def _run(index: int, job: BatchJob) -> BatchResult:
+        start = time.perf_counter()
+        try:
+            path = run_pipeline(job.prompt, job.context, job.output, groq_key, hf_token,
+                                max_image_workers=max_image_workers, manager=manager, img_gen=img_gen, **options)
+            status, error = ("ok", None) if path else ("failed", "pipeline retornou None")
+        except Exception as e:
+            traceback.print_exc()
+            status, error = "failed", repr(e)
+        return BatchResult(index=index, prompt=job.prompt, output=job.output, status=status,
+                           seconds=round(time.perf_counter() - start, 3), error=error)
+
+    batch_start = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="deck") as pool:
+        futures = [pool.submit(_run, i, job) for i, job in enumerate(jobs, start=1)]
+        for future in as_completed(futures):
+            r = future.result()
+            results.append(r)
+            icon = "✅" if r.status == "ok" else "❌"
+            print(f"{icon} [{len(results)}/{len(jobs)}] Job {r.index} ({r.seconds}s): {r.output}")
+
+    results.sort(key=lambda r: r.index)
+    ok = sum(1 for r in results if r.status == "ok")
+    summary = {
+        "total": len(results),
+        "ok": ok,
+        "failed": len(results) - ok,
+        "wall_seconds": round(time.perf_counter() - batch_start, 3),
+        "jobs": [r.model_dump() for r in results],
+    }
+    print(f"\n📊 Batch concluído: {ok}/{len(results)} decks em {summary['wall_seconds']}s")
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"   📝 Relatório: {report_path}")
+    return results
@@ -0,0 +1,109 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+from src.core.models import DeckIR, SlideIR
+
+# Incrementar quando o formato do manifesto ou o layout/render mudarem de forma incompatível
+BUILD_MANIFEST_VERSION = 2
+
+def _digest(payload: Any) -> str:
+    data = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:20]
+
+def input_hash(prompt: str, context_text: Optional[str], num_slides: int, fanout: bool = False) -> str:
+    """Hash de tudo que alimenta os estágios de LLM: se mudar, o texto é refeito."""
+    return _digest([prompt, context_text or "", num_slides, fanout])
+
+def slide_text_hash(s: SlideIR) -> str:
+    """Conteúdo textual do slide; o id (posicional) e a imagem ficam de fora."""
+    return _digest(s.model_dump(mode="json", exclude={"id", "image"}))
+
+def image_key(s: SlideIR) -> Optional[str]:
+    """Só o prompt e a proporção definem a imagem; None se o slide não tem prompt."""
+    if not s.image or not s.image.prompt:
+        return None
+    return _digest([s.image.prompt, s.image.aspect_ratio])
+
+def _file_stamp(path: Optional[str]) -> Optional[List]:
+    # Fallbacks reescrevem o mesmo caminho: tamanho e mtime distinguem o conteúdo
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [path, st.st_size, st.st_mtime_ns]
+
+def layout_hash(s: SlideIR, salt: str = "") -> str:
+    """Tudo que decide as caixas e o XML do slide renderizado."""
+    image = s.image
+    image_state = [image.status, _file_stamp(image.local_path)] if image else None
+    return _digest([BUILD_MANIFEST_VERSION, slide_text_hash(s), image_state, salt])
+
+def load_deck(path: str) -> DeckIR:
+    """Lê um DeckIR em JSON (aceita também um manifesto de build, usando o `deck` dele)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and isinstance(data.get("deck"), dict):
+        data = data["deck"]
+    return DeckIR.model_validate(data)
+
+class SlideBuild(BaseModel):
+    """Artefatos de um slide no último build."""
+    id: str
+    text_hash: str
+    image_key: Optional[str] = None
+    image_path: Optional[str] = None
+    layout_hash: str
+    # LayoutSlide serializado (o core não depende do engine)
+    layout: Optional[Dict[str, Any]] = None
+    # spTree do slide renderizado, com as imagens como marcadores
+    fragment: Optional[str] = None
+
+class BuildManifest(BaseModel):
+    """
+    Manifesto persistido ao lado do .pptx.
+
+    Funciona como o grafo de dependências de um `make`: cada estágio de um
+    slide só é refeito quando o hash das suas entradas difere do build anterior.
+    """
+    version: int = BUILD_MANIFEST_VERSION
+    input_hash: Optional[str] = None
+    deck: Optional[DeckIR] = None
+    slides: List[SlideBuild] = Field(default_factory=list)
+
+    @staticmethod
+    def path_for(output_file: str) -> str:
+        return f"{output_file}.build.json"
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BuildManifest"]:
+        if not Path(path).exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = cls.model_validate(json.load(f))
+        except Exception as e:
+            print(f"   ⚠️ Manifesto de build ilegível ({e}). Refazendo tudo.")
+            return None
+        if manifest.version != BUILD_MANIFEST_VERSION:
+            print("   ⚠️ Manifesto de build de outra versão. Refazendo tudo.")
+            return None
+        return manifest
+
+    def save(self, path: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.model_dump_json())
+        os.replace(tmp_path, path)
+
+    def image_paths(self) -> Dict[str, str]:
+        """image_key -> arquivo, só para arquivos que ainda existem."""
+        return {e.image_key: e.image_path for e in self.slides
+                if e.image_key and e.image_path and Path(e.image_path).exists()}
+
+    def by_layout(self) -> Dict[str, SlideBuild]:
+        return {e.layout_hash: e for e in self.slides if e.layout}
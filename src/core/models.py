@@ -60,5 +60,6 @@ class ContextPack(BaseModel):
     prompt: str
     source_text: str
     cleaned_text: Optional[str] = None
+    chunks: List[str] = Field(default_factory=list)
     constraints: Constraints = Field(default_factory=Constraints)
-    meta: Dict[str, Any] = {}
\ No newline at end of file
+    meta: Dict[str, Any] = {}
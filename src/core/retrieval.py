@@ -0,0 +1,156 @@
+import io
+import re
+import math
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Union
+import numpy as np
+from src.core.utils import sanitize_text
+from src.core.models import ContextPack
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Palavras muito frequentes que só diluem o score
+STOPWORDS = set("""
+a o os as um uma uns umas de do da dos das em no na nos nas por para com sem
+e ou que se ao aos à às é são ser foi como mais menos muito pelo pela pelos pelas
+the of and to in is are for on with by an be this that it from at as or
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa barata (~4 caracteres por token), suficiente para orçamentos de prompt."""
+    return max(1, len(text) // 4)
+
+def iter_chunks(source: Union[str, TextIO], chunk_chars: int = 1200, read_size: int = 64 * 1024) -> Iterator[str]:
+    """
+    Lê o texto em blocos e devolve pedaços de ~`chunk_chars`, cortando em
+    fronteiras de parágrafo/linha quando possível. Cada pedaço passa pelo
+    `sanitize_text` isoladamente, então o documento nunca é processado inteiro
+    de uma vez (funciona com arquivos e stdin de vários MB).
+    """
+    stream = io.StringIO(source) if isinstance(source, str) else source
+    buffer, start = "", 0
+    while True:
+        block = stream.read(read_size)
+        if block:
+            # Uma cópia por bloco lido (o que sobrou + o novo), não por pedaço
+            buffer = buffer[start:] + block
+            start = 0
+        while len(buffer) - start >= chunk_chars or (not block and start < len(buffer)):
+            end = start + chunk_chars
+            if len(buffer) <= end:
+                cut = len(buffer)
+            else:
+                half = start + chunk_chars // 2
+                cut = buffer.rfind("\n\n", start, end)
+                if cut < half:
+                    cut = buffer.rfind("\n", start, end)
+                if cut < half:
+                    cut = buffer.rfind(" ", start, end)
+                if cut < half:
+                    cut = end
+            cleaned = sanitize_text(buffer[start:cut])
+            start = cut
+            if cleaned:
+                yield cleaned
+        if not block:
+            break
+
+class ContextIndex:
+    """
+    Índice léxico BM25 sobre os pedaços do documento.
+
+    Guarda um índice invertido (termo → arrays NumPy de documentos e
+    frequências), então pontuar uma consulta custa O(postings dos termos da
+    consulta), não O(documento).
+    """
+
+    def __init__(self, chunks: List[str], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        n = len(chunks)
+        self.doc_len = np.zeros(n, dtype=np.float32)
+        postings: Dict[str, List[tuple]] = {}
+        for doc_id, chunk in enumerate(chunks):
+            counts = Counter(tokenize(chunk))
+            self.doc_len[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        self.avgdl = float(self.doc_len.mean()) if n else 0.0
+        self._postings: Dict[str, tuple] = {}
+        for term, items in postings.items():
+            docs = np.fromiter((d for d, _ in items), dtype=np.int32, count=len(items))
+            tfs = np.fromiter((t for _, t in items), dtype=np.float32, count=len(items))
+            idf = math.log(1 + (n - len(items) + 0.5) / (len(items) + 0.5))
+            self._postings[term] = (docs, tfs, idf)
+
+    def scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        if not self.chunks:
+            return scores
+        norm = self.k1 * (1 - self.b + self.b * self.doc_len / (self.avgdl or 1.0))
+        for term in set(tokenize(query)):
+            entry = self._postings.get(term)
+            if entry is None:
+                continue
+            docs, tfs, idf = entry
+            # doc ids são únicos por termo, então a soma indexada é segura
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+        return scores
+
+    def top_k(self, query: str, k: int = 3, token_budget: Optional[int] = None,
+              exclude: Iterable[int] = ()) -> List[int]:
+        """Índices dos k pedaços mais relevantes que cabem no orçamento, na ordem do documento."""
+        if not self.chunks:
+            return []
+        scores = self.scores(query)
+        excluded = set(exclude)
+        candidates = np.argsort(-scores, kind="stable")
+        picked, used = [], 0
+        for idx in candidates:
+            idx = int(idx)
+            if scores[idx] <= 0 or len(picked) >= k:
+                break
+            if idx in excluded:
+                continue
+            cost = estimate_tokens(self.chunks[idx])
+            if token_budget is not None and used + cost > token_budget:
+                continue
+            picked.append(idx)
+            used += cost
+        return sorted(picked)
+
+    def select(self, query: str, k: int = 3, token_budget: Optional[int] = None) -> str:
+        """Texto dos pedaços escolhidos; sem acerto nenhum, cai no início do documento."""
+        ids = self.top_k(query, k, token_budget)
+        if not ids and self.chunks:
+            ids = [0]
+        return "\n[...]\n".join(self.chunks[i] for i in ids)
+
+def split_plan(plan_text: str, num_slides: int) -> List[str]:
+    """Divide a saída do planejador em um trecho por slide ("Slide 1", "Slide 2"...)."""
+    # O delimitador inteiro sai do texto: "**Slide 2:** a" e "Slide 2 - a" viram "a"
+    parts = re.split(r"(?im)^\W*slide\s*(\d+)\b[^\w\n]*", plan_text)
+    sections: Dict[int, str] = {}
+    # re.split com grupo: [prefixo, num, texto, num, texto, ...]
+    for i in range(1, len(parts) - 1, 2):
+        n = int(parts[i])
+        sections[n] = (sections.get(n, "") + " " + parts[i + 1]).strip()
+    if not sections:
+        return [plan_text] * num_slides
+    return [sections.get(i, "") for i in range(1, num_slides + 1)]
+
+def build_context_pack(prompt: str, source: Union[str, TextIO, None], chunk_chars: int = 1200) -> ContextPack:
+    """Monta o ContextPack em fluxo: o texto é fatiado e limpo pedaço a pedaço."""
+    chunks = list(iter_chunks(source, chunk_chars)) if source else []
+    cleaned = "\n\n".join(chunks)
+    return ContextPack(
+        prompt=prompt,
+        source_text=source if isinstance(source, str) else cleaned,
+        cleaned_text=cleaned,
+        chunks=chunks,
+    )
@@ -0,0 +1,128 @@
+import json
+import time
+import threading
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("slidegen_span", default=None)
+
+class Tracer:
+    """
+    Coletor de spans e contadores do pipeline.
+
+    - `span(name, **attrs)`: cronometra um estágio/sub-etapa (aninhamento via contextvars).
+    - `incr(name, value, **labels)`: contadores (tokens, hits de cache, fallbacks...).
+    Exporta para um arquivo JSON de trace e para texto no formato Prometheus.
+    """
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.spans: List[dict] = []
+        self.counters: Dict[Tuple[str, Tuple], float] = defaultdict(float)
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        with self._lock:
+            self._next_id += 1
+            span_id = self._next_id
+        parent = _current_span.get()
+        token = _current_span.set(span_id)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except BaseException as e:
+            error = repr(e)
+            raise
+        finally:
+            end = time.perf_counter()
+            _current_span.reset(token)
+            record = {
+                "id": span_id,
+                "parent": parent,
+                "name": name,
+                "thread": threading.current_thread().name,
+                "start_ms": round((start - self._origin) * 1000, 3),
+                "duration_ms": round((end - start) * 1000, 3),
+                "attrs": attrs,
+            }
+            if error:
+                record["error"] = error
+            with self._lock:
+                self.spans.append(record)
+
+    def incr(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] += value
+
+    def summary(self) -> dict:
+        """Agrega os spans por nome (contagem, total e máximo em ms)."""
+        agg: Dict[str, dict] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            a = agg.setdefault(s["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            a["count"] += 1
+            a["total_ms"] = round(a["total_ms"] + s["duration_ms"], 3)
+            a["max_ms"] = max(a["max_ms"], s["duration_ms"])
+        return agg
+
+    def write_json(self, path: str):
+        with self._lock:
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in self.counters.items()]
+            spans = sorted(self.spans, key=lambda s: s["start_ms"])
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"spans": spans, "counters": counters, "summary": self.summary()},
+                      f, ensure_ascii=False, indent=2, default=str)
+
+    def write_prometheus(self, path: str, prefix: str = "slidegen"):
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+        for (name, labels), value in counters:
+            lines.append(f"{prefix}_{name}_total{_format_labels(labels)} {value}")
+        for name, a in sorted(self.summary().items()):
+            labels = _format_labels((("span", name),))
+            lines.append(f"{prefix}_span_seconds_sum{labels} {a['total_ms'] / 1000:.6f}")
+            lines.append(f"{prefix}_span_seconds_count{labels} {a['count']}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+class NullTracer:
+    """Tracer desligado: todas as operações são no-op."""
+    enabled = False
+
+    def span(self, name: str, **attrs):
+        return nullcontext(attrs)
+
+    def incr(self, name: str, value: float = 1, **labels):
+        pass
+
+    def summary(self) -> dict:
+        return {}
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels:
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+_tracer = NullTracer()
+
+def get_tracer():
+    return _tracer
+
+def set_tracer(tracer: Optional[Tracer]):
+    """Instala o tracer global (None volta ao NullTracer)."""
+    global _tracer
+    _tracer = tracer if tracer is not None else NullTracer()
+    return _tracer
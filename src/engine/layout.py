@@ -1,7 +1,24 @@
-from typing import List, Optional
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
 from pydantic import BaseModel
 from src.core.models import DeckIR, SlideIR, SlideType, ImageRef
 
+# Margens internas padrão da caixa de texto do PowerPoint (o renderer não as altera)
+INSET_X_IN = 0.1
+INSET_Y_IN = 0.05
+# Altura de linha em múltiplos do corpo da fonte (espaçamento simples do PowerPoint)
+LINE_SPACING = 1.2
+TITLE_FONT_SIZE = 40
+TITLE_MIN_FONT_SIZE = 24
+BODY_FONT_SIZE = 28
+BODY_MIN_FONT_SIZE = 12
+# Calibri é a fonte do tema padrão; Carlito tem as mesmas métricas; DejaVu é mais larga (conservadora)
+FONT_CANDIDATES = ("calibri.ttf", "Carlito-Regular.ttf", "DejaVuSans.ttf", "Arial.ttf")
+# Sem nenhuma fonte disponível: largura média de um caractere, em em
+AVG_CHAR_EM = 0.5
+_REF_SIZE = 100
+
 class LayoutBox(BaseModel):
     kind: str # 'text' ou 'image'
     role: str
@@ -10,7 +27,12 @@ class LayoutBox(BaseModel):
     w: float
     h: float
     font_size: int = 18
+    # Texto único (caixas antigas/externas); o layout preenche só `paragraphs`
     text: Optional[str] = None
+    # Um parágrafo por bullet
+    paragraphs: Optional[List[str]] = None
+    # O texto não coube nem no corpo mínimo
+    overflow: bool = False
     image_ref: Optional[ImageRef] = None
 
 class LayoutSlide(BaseModel):
@@ -21,33 +43,160 @@ class LayoutSlide(BaseModel):
 class LayoutDeck(BaseModel):
     slides: List[LayoutSlide]
 
-def compute_layout(deck: DeckIR) -> LayoutDeck:
-    layout_slides = []
+class TextMeasurer:
+    """
+    Mede texto em "em" (fração do corpo da fonte) com as métricas do Pillow.
+
+    A largura de cada caractere é medida uma vez num corpo de referência e
+    escala linearmente com o tamanho; palavras são memoizadas. Assim medir
+    um deck inteiro custa basicamente somas de floats.
+    """
+
+    def __init__(self, font_candidates: Sequence[str] = FONT_CANDIDATES):
+        self.font = _load_font(font_candidates)
+        self._chars: Dict[str, float] = {}
+        self.word_em = lru_cache(maxsize=65536)(self._word_em)
+
+    def char_em(self, ch: str) -> float:
+        width = self._chars.get(ch)
+        if width is None:
+            width = self.font.getlength(ch) / _REF_SIZE if self.font else AVG_CHAR_EM
+            self._chars[ch] = width
+        return width
+
+    def _word_em(self, word: str) -> float:
+        # Ignora kerning: erra para mais por frações de em, o que só deixa o ajuste conservador
+        return sum(self.char_em(ch) for ch in word)
+
+def _load_font(candidates: Sequence[str]):
+    try:
+        from PIL import ImageFont
+    except ImportError:
+        return None
+    for name in candidates:
+        try:
+            return ImageFont.truetype(name, _REF_SIZE)
+        except OSError:
+            continue
+    try:
+        # Pillow >= 10.1 traz uma fonte escalável embutida
+        return ImageFont.load_default(_REF_SIZE)
+    except TypeError:
+        return None
+
+_measurer: Optional[TextMeasurer] = None
+_measurer_lock = threading.Lock()
+
+def get_measurer() -> TextMeasurer:
+    """Medidor compartilhado pelo processo (fonte carregada e tabelas de largura uma única vez)."""
+    global _measurer
+    with _measurer_lock:
+        if _measurer is None:
+            _measurer = TextMeasurer()
+        return _measurer
+
+def reset_text_metrics():
+    """Descarta o medidor compartilhado (benchmarks a frio, troca de fontes)."""
+    global _measurer
+    with _measurer_lock:
+        _measurer = None
+
+def _count_lines(words: List[float], space: float, max_em: float) -> int:
+    """Linhas ocupadas por um parágrafo com quebra gulosa por palavra."""
+    lines, current = 1, 0.0
+    for w in words:
+        if current == 0.0:
+            current = w
+        elif current + space + w <= max_em:
+            current += space + w
+        else:
+            lines += 1
+            current = w
+        if current > max_em:
+            # Palavra maior que a linha: o PowerPoint a quebra no meio
+            extra = int(current // max_em)
+            lines += extra
+            current -= extra * max_em
+    return lines
+
+def fit_font_size(paragraphs: Sequence[str], w_in: float, h_in: float, max_size: int,
+                  min_size: int = BODY_MIN_FONT_SIZE, measurer: Optional[TextMeasurer] = None) -> Tuple[int, bool]:
+    """
+    Maior corpo inteiro (pt) em que os parágrafos cabem na caixa, por busca binária.
+
+    Returns:
+        (tamanho, cabe). Se nem `min_size` couber, devolve (min_size, False).
+    """
+    m = measurer or get_measurer()
+    width_pt = max(1.0, (w_in - 2 * INSET_X_IN) * 72)
+    height_pt = max(1.0, (h_in - 2 * INSET_Y_IN) * 72)
+    space = m.char_em(" ")
+    # Larguras medidas uma vez; cada tentativa de corpo só refaz a quebra de linhas
+    widths = [[m.word_em(word) for word in p.split()] for p in paragraphs]
+
+    def fits(size: int) -> bool:
+        max_em = width_pt / size
+        lines = sum(_count_lines(words, space, max_em) for words in widths)
+        return lines * size * LINE_SPACING <= height_pt
+
+    if fits(max_size):
+        return max_size, True
+    if not fits(min_size):
+        return min_size, False
+    lo, hi = min_size, max_size - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo, True
+
+def _text_box(role: str, x: float, y: float, w: float, h: float, paragraphs: List[str],
+              max_size: int, min_size: int) -> LayoutBox:
+    size, fits = fit_font_size(paragraphs, w, h, max_size, min_size)
+    return LayoutBox.model_construct(kind="text", role=role, x=x, y=y, w=w, h=h, font_size=size,
+                                     paragraphs=paragraphs, overflow=not fits)
+
+def layout_slide(s: SlideIR) -> LayoutSlide:
+    """
+    Calcula as caixas de um único slide (usado também no modo streaming).
+
+    Estágio interno: os valores já têm o tipo certo, então as caixas são
+    montadas com `model_construct`, que não copia as listas como a validação
+    faz: as caixas compartilham os bullets e o ImageRef do SlideIR. Nenhum
+    estágio altera essas listas no lugar (o QA copia o slide ao corrigir).
+    Cada caixa tem o próprio set de campos preenchidos (o do `model_construct`).
+    """
+    boxes = []
     
-    for s in deck.slides:
-        boxes = []
+    # Título sempre presente
+    boxes.append(_text_box("title", 1, 0.5, 11.3, 1, [s.title], TITLE_FONT_SIZE, TITLE_MIN_FONT_SIZE))
+    
+    # Layout Híbrido (Texto + Imagem)
+    if s.image and s.image.status == "ready" and s.image.local_path:
+        content = [s.caption] if s.caption else (s.bullets or [])
+        # Texto à Esquerda
+        boxes.append(_text_box("body", 1.0, 1.8, 6.0, 5.0, content, BODY_FONT_SIZE, BODY_MIN_FONT_SIZE))
+        # Imagem à Direita
+        boxes.append(LayoutBox.model_construct(kind="image", role="hero", x=7.5, y=1.8, w=5.0, h=5.0,
+                                               font_size=0, image_ref=s.image))
         
-        # Título sempre presente
-        boxes.append(LayoutBox(kind="text", role="title", x=1, y=0.5, w=11.3, h=1, font_size=40, text=s.title))
+    # Layout Duas Colunas
+    elif s.type == SlideType.TWO_COLUMNS and s.columns:
+        left = _text_box("body", 1.0, 1.8, 5.5, 5.0, s.columns.left, BODY_FONT_SIZE, BODY_MIN_FONT_SIZE)
+        right = _text_box("body", 7.0, 1.8, 5.5, 5.0, s.columns.right, BODY_FONT_SIZE, BODY_MIN_FONT_SIZE)
+        # As duas colunas usam o mesmo corpo (o menor dos dois ajustes)
+        size = min(left.font_size, right.font_size)
+        left.font_size = right.font_size = size
+        boxes.extend([left, right])
         
-        # Layout Híbrido (Texto + Imagem)
-        if s.image and s.image.status == "ready" and s.image.local_path:
-            content = s.caption or ("\n".join(s.bullets) if s.bullets else "")
-            # Texto à Esquerda
-            boxes.append(LayoutBox(kind="text", role="body", x=1.0, y=1.8, w=6.0, h=5.0, font_size=24, text=content))
-            # Imagem à Direita
-            boxes.append(LayoutBox(kind="image", role="hero", x=7.5, y=1.8, w=5.0, h=5.0, font_size=0, image_ref=s.image))
-            
-        # Layout Duas Colunas
-        elif s.type == SlideType.TWO_COLUMNS and s.columns:
-            boxes.append(LayoutBox(kind="text", role="body", x=1.0, y=1.8, w=5.5, h=5.0, font_size=24, text="\n".join(s.columns.left)))
-            boxes.append(LayoutBox(kind="text", role="body", x=7.0, y=1.8, w=5.5, h=5.0, font_size=24, text="\n".join(s.columns.right)))
-            
-        # Layout Padrão (Bullets)
-        else:
-            content = "\n".join(s.bullets) if s.bullets else ""
-            boxes.append(LayoutBox(kind="text", role="body", x=1.0, y=1.8, w=11.3, h=5.0, font_size=24, text=content))
+    # Layout Padrão (Bullets)
+    else:
+        boxes.append(_text_box("body", 1.0, 1.8, 11.3, 5.0, s.bullets or [], BODY_FONT_SIZE, BODY_MIN_FONT_SIZE))
+
+    return LayoutSlide.model_construct(id=s.id, boxes=boxes, notes=s.notes)
+
+def compute_layout(deck: DeckIR) -> LayoutDeck:
+    return LayoutDeck.model_construct(slides=[layout_slide(s) for s in deck.slides])
 
-        layout_slides.append(LayoutSlide(id=s.id, boxes=boxes, notes=s.notes))
-        
-    return LayoutDeck(slides=layout_slides)
\ No newline at end of file
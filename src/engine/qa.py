@@ -1,6 +1,9 @@
-from typing import List, Dict, Optional, Literal, Any
+import re
+from typing import Callable, Dict, List, Optional, Literal, Any
+import numpy as np
 from pydantic import BaseModel, Field
-from src.core.models import DeckIR
+from src.core.models import Constraints, DeckIR, SlideIR
+from src.core.utils import truncate_text
 
 # --- Modelos de QA ---
 class TicketTarget(BaseModel):
@@ -10,6 +13,7 @@ class FeedbackTicket(BaseModel):
     issue_code: str # Ex: 'NARRATIVE_GAP', 'WEAK_TITLES'
     target: TicketTarget
     suggested_fix: str
+    auto_fix: bool = False
 
 class Scorecard(BaseModel):
     passed: bool
@@ -19,11 +23,98 @@ class EvaluationEnvelope(BaseModel):
     scorecard: Scorecard
     tickets: List[FeedbackTicket]
 
-# --- Lógica de Auditoria (Simulada) ---
-def editorial_qa_simulation(deck: DeckIR) -> EvaluationEnvelope:
+# --- Features por slide (uma passada pelo deck) ---
+class DeckFeatures:
+    """
+    Colunas NumPy com as medidas de cada slide; as regras viram máscaras
+    booleanas sobre o deck inteiro em vez de laços por slide.
+    """
+
+    def __init__(self, deck: DeckIR):
+        n = len(deck.slides)
+        self.ids = [s.id for s in deck.slides]
+        self.title_words = np.zeros(n, dtype=np.int32)
+        self.bullet_count = np.zeros(n, dtype=np.int32)
+        self.max_bullet_words = np.zeros(n, dtype=np.int32)
+        self.duplicate_title = np.zeros(n, dtype=bool)
+        seen_titles = set()
+        for i, s in enumerate(deck.slides):
+            self.title_words[i] = len(s.title.split())
+            columns = _slide_columns(s)
+            # Em duas colunas o limite de bullets vale por coluna
+            self.bullet_count[i] = max((len(col) for col in columns), default=0)
+            self.max_bullet_words[i] = max((len(b.split()) for col in columns for b in col), default=0)
+            key = _normalize_title(s.title)
+            if key:
+                self.duplicate_title[i] = key in seen_titles
+                seen_titles.add(key)
+
+def _slide_columns(s: SlideIR) -> List[List[str]]:
+    if s.columns:
+        return [s.columns.left, s.columns.right]
+    return [s.bullets or []]
+
+def _normalize_title(title: str) -> str:
+    return re.sub(r"\W+", " ", title.lower()).strip()
+
+# --- Correções (copy-on-write: cada uma lê e escreve só o dict de atualização) ---
+Fix = Callable[[SlideIR, Dict[str, Any], Constraints], None]
+
+def _fix_title(s: SlideIR, update: Dict[str, Any], c: Constraints):
+    update["title"] = truncate_text(update.get("title", s.title), c.max_title_words)
+
+def _map_items(s: SlideIR, update: Dict[str, Any], fn: Callable[[List[str]], List[str]]):
+    """Aplica `fn` aos bullets (ou a cada coluna), sobre o valor já corrigido se houver."""
+    if s.columns:
+        cols = update.get("columns", s.columns)
+        update["columns"] = cols.model_copy(update={"left": fn(cols.left), "right": fn(cols.right)})
+    else:
+        update["bullets"] = fn(update.get("bullets", s.bullets) or [])
+
+def _fix_bullet_count(s: SlideIR, update: Dict[str, Any], c: Constraints):
+    extra = []
+
+    def cut(items: List[str]) -> List[str]:
+        extra.extend(items[c.max_bullets:])
+        return items[:c.max_bullets]
+
+    _map_items(s, update, cut)
+    # O excedente vai para as notas do apresentador em vez de sumir
+    if extra:
+        notes = update.get("notes", s.notes)
+        update["notes"] = "\n".join(filter(None, [notes, *extra]))
+
+def _fix_long_bullets(s: SlideIR, update: Dict[str, Any], c: Constraints):
+    _map_items(s, update, lambda items: [truncate_text(b, c.max_words_bullet) for b in items])
+
+class QARule(BaseModel):
+    code: str
+    suggested_fix: str
+    mask: Callable[[DeckFeatures, Constraints], np.ndarray]
+    fix: Optional[Fix] = None
+
+# Ordem importa na aplicação: cortar bullets excedentes antes de encurtar os restantes
+RULES: List[QARule] = [
+    QARule(code="WEAK_TITLE", suggested_fix="Encurtar título.",
+           mask=lambda f, c: f.title_words > c.max_title_words, fix=_fix_title),
+    QARule(code="EMPTY_TITLE", suggested_fix="Adicionar um título.",
+           mask=lambda f, c: f.title_words == 0),
+    QARule(code="TOO_MANY_BULLETS", suggested_fix="Reduzir o número de bullets.",
+           mask=lambda f, c: f.bullet_count > c.max_bullets, fix=_fix_bullet_count),
+    QARule(code="LONG_BULLET", suggested_fix="Encurtar bullets longos.",
+           mask=lambda f, c: f.max_bullet_words > c.max_words_bullet, fix=_fix_long_bullets),
+    QARule(code="DUPLICATE_TITLE", suggested_fix="Diferenciar títulos repetidos.",
+           mask=lambda f, c: f.duplicate_title),
+]
+_RULES_BY_CODE = {r.code: r for r in RULES}
+
+# --- Motor de QA ---
+def run_editorial_qa(deck: DeckIR, constraints: Optional[Constraints] = None) -> EvaluationEnvelope:
+    """Avalia o deck inteiro contra as `Constraints` (uma passada + máscaras por regra)."""
+    c = constraints or Constraints()
     tickets = []
-    
-    # Regra 1: Deck muito curto
+
+    # Regra de deck: muito curto
     if len(deck.slides) < 2:
         tickets.append(FeedbackTicket(
             issue_code="NARRATIVE_GAP",
@@ -31,33 +122,71 @@ def editorial_qa_simulation(deck: DeckIR) -> EvaluationEnvelope:
             suggested_fix="Adicionar mais slides de conteúdo."
         ))
 
-    # Regra 2: Títulos muito longos ou texto excessivo
-    for s in deck.slides:
-        # Verifica tamanho do título
-        if len(s.title.split()) > 12:
+    features = DeckFeatures(deck)
+    for rule in RULES:
+        for i in np.flatnonzero(rule.mask(features, c)):
             tickets.append(FeedbackTicket(
-                issue_code="WEAK_TITLE",
-                target=TicketTarget(slide_id=s.id),
-                suggested_fix="Encurtar título."
+                issue_code=rule.code,
+                target=TicketTarget(slide_id=features.ids[i]),
+                suggested_fix=rule.suggested_fix,
+                auto_fix=rule.fix is not None,
             ))
-            
+
     passed = (len(tickets) == 0)
     return EvaluationEnvelope(
         scorecard=Scorecard(passed=passed, tickets=tickets),
         tickets=tickets
     )
 
+def apply_tickets(deck: DeckIR, tickets: List[FeedbackTicket], constraints: Optional[Constraints] = None) -> DeckIR:
+    """
+    Aplica as correções automáticas dos tickets.
+
+    Os slides são localizados por id e só os corrigidos são copiados; os
+    demais (e as imagens) são compartilhados com o deck de entrada, que não
+    é alterado.
+    """
+    c = constraints or Constraints()
+    by_slide: Dict[str, set] = {}
+    for t in tickets:
+        rule = _RULES_BY_CODE.get(t.issue_code)
+        if rule and rule.fix and t.target.slide_id:
+            by_slide.setdefault(t.target.slide_id, set()).add(rule.code)
+    if not by_slide:
+        return deck
+
+    index = {s.id: i for i, s in enumerate(deck.slides)}
+    slides = list(deck.slides)
+    for slide_id, codes in by_slide.items():
+        i = index.get(slide_id)
+        if i is None:
+            continue
+        update: Dict[str, Any] = {}
+        for rule in RULES:
+            if rule.code in codes:
+                rule.fix(slides[i], update, c)
+        slides[i] = slides[i].model_copy(update=update)
+    return deck.model_copy(update={"slides": slides})
+
+def qa_gate(deck: DeckIR, constraints: Optional[Constraints] = None) -> tuple:
+    """
+    Gate pré-render: avalia, aplica as correções automáticas e reavalia.
+
+    Returns:
+        (deck_corrigido, envelope_final) — o envelope lista só o que sobrou.
+    """
+    envelope = run_editorial_qa(deck, constraints)
+    if envelope.scorecard.passed:
+        return deck, envelope
+    fixed = apply_tickets(deck, envelope.tickets, constraints)
+    if fixed is deck:
+        return deck, envelope
+    return fixed, run_editorial_qa(fixed, constraints)
+
+# Nomes antigos mantidos para compatibilidade
+def editorial_qa_simulation(deck: DeckIR) -> EvaluationEnvelope:
+    return run_editorial_qa(deck)
+
 def apply_tickets_simulation(deck: DeckIR, tickets: List[FeedbackTicket]) -> DeckIR:
     """Aplica correções simples baseadas nos tickets."""
-    import copy
-    new_deck = copy.deepcopy(deck)
-    
-    for ticket in tickets:
-        if ticket.issue_code == "WEAK_TITLE" and ticket.target.slide_id:
-            for s in new_deck.slides:
-                if s.id == ticket.target.slide_id:
-                    # Correção heurística simples: corta o título
-                    words = s.title.split()
-                    s.title = " ".join(words[:8]) + "..."
-                    
-    return new_deck
\ No newline at end of file
+    return apply_tickets(deck, tickets)
@@ -1,35 +1,217 @@
+import io
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import IO, Dict, Iterable, List, Optional, Tuple, Union
+from lxml import etree
 from pptx import Presentation
+from pptx.oxml import parse_xml
+from pptx.dml.color import RGBColor
 from pptx.util import Inches, Pt
-from src.engine.layout import LayoutDeck
+from src.engine.layout import LayoutDeck, LayoutSlide, LayoutBox
+from src.services.image_cache import memory_images
 
-def render_pptx(layout_deck: LayoutDeck, filename: str) -> str:
-    prs = Presentation()
-    prs.slide_width = Inches(13.33)
-    prs.slide_height = Inches(7.5)
-    blank_layout = prs.slide_layouts[6]
+SLIDE_WIDTH_IN = 13.33
+SLIDE_HEIGHT_IN = 7.5
+# Resolução máxima das imagens embutidas (pixels por polegada da caixa)
+DEFAULT_IMAGE_DPI = 150
+
+_A_BLIP = "{http://schemas.openxmlformats.org/drawingml/2006/main}blip"
+_R_EMBED = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed"
+
+_base_pptx: Optional[bytes] = None
+_base_lock = threading.Lock()
+
+def _base_presentation_bytes() -> bytes:
+    """Apresentação base (template padrão em 16:9) serializada uma vez por processo."""
+    global _base_pptx
+    with _base_lock:
+        if _base_pptx is None:
+            prs = Presentation()
+            prs.slide_width = Inches(SLIDE_WIDTH_IN)
+            prs.slide_height = Inches(SLIDE_HEIGHT_IN)
+            buf = io.BytesIO()
+            prs.save(buf)
+            _base_pptx = buf.getvalue()
+        return _base_pptx
+
+def _prepare_image(path: str, max_px: Tuple[int, int]) -> bytes:
+    """
+    Lê a imagem e reduz cada dimensão ao tamanho da caixa no DPI alvo.
+    A caixa já estica a figura, então reduzir cada eixo separadamente não
+    altera o resultado visual, só o peso do arquivo. Imagens geradas neste
+    processo vêm da memória, sem reler o disco.
+    """
+    from PIL import Image
+    data = memory_images().get(path)
+    with Image.open(io.BytesIO(data) if data is not None else path) as img:
+        target = (min(img.width, max_px[0]), min(img.height, max_px[1]))
+        if target == img.size:
+            if data is not None:
+                return data
+            with open(path, "rb") as f:
+                return f.read()
+        resized = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB").resize(target, Image.LANCZOS)
+        buf = io.BytesIO()
+        resized.save(buf, format="PNG", optimize=False)
+        return buf.getvalue()
+
+class PptxBuilder:
+    """
+    Monta a apresentação slide a slide (permite renderização incremental).
+
+    Use como context manager (ou chame `close`): o pool de preparo das
+    imagens é encerrado mesmo quando um slide falha antes do `save`.
+    """
+
+    def __init__(self, image_dpi: int = DEFAULT_IMAGE_DPI, image_workers: int = 4, theme_id: str = "default"):
+        self.prs = Presentation(io.BytesIO(_base_presentation_bytes()))
+        self.blank_layout = self.prs.slide_layouts[6]
+        self.image_dpi = image_dpi
+        # O tema padrão mantém o template (fundo branco, texto preto); os outros
+        # usam a mesma paleta dos placeholders do fallback
+        self.theme = None
+        if theme_id != "default":
+            from src.services.fallback_render import THEMES
+            self.theme = THEMES.get(theme_id)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, image_workers), thread_name_prefix="pptximg")
+        # (caminho, px) -> Future[bytes]: cada arquivo é lido/reduzido uma única vez
+        self._images: Dict[Tuple[str, Tuple[int, int]], Future] = {}
+
+    def _image_key(self, box: LayoutBox) -> Tuple[str, Tuple[int, int]]:
+        px = (max(1, int(box.w * self.image_dpi)), max(1, int(box.h * self.image_dpi)))
+        return box.image_ref.local_path, px
+
+    def _submit_image(self, box: LayoutBox) -> Future:
+        key = self._image_key(box)
+        if key not in self._images:
+            self._images[key] = self._pool.submit(_prepare_image, *key)
+        return self._images[key]
+
+    def prefetch(self, slides: Iterable[LayoutSlide]):
+        """Dispara em paralelo o preparo de todas as imagens dos slides."""
+        for slide_data in slides:
+            for box in slide_data.boxes:
+                if box.kind == "image" and box.image_ref and box.image_ref.local_path:
+                    self._submit_image(box)
+
+    def _image_sources(self, slide_data: LayoutSlide) -> List[io.BytesIO]:
+        return [io.BytesIO(self._submit_image(box).result()) for box in slide_data.boxes
+                if box.kind == "image" and box.image_ref and box.image_ref.local_path]
+
+    def add_slide(self, slide_data: LayoutSlide, fragment: Optional[str] = None):
+        """
+        Adiciona um slide. Com `fragment` (saída de `export_fragment` de um
+        build anterior), o spTree é reaproveitado em vez de montar as formas.
+        """
+        slide = self.prs.slides.add_slide(self.blank_layout)
+        if self.theme:
+            # O fundo fica fora do spTree: vale também para fragmentos reaproveitados
+            fill = slide.background.fill
+            fill.solid()
+            fill.fore_color.rgb = RGBColor(*self.theme.background)
 
-    for slide_data in layout_deck.slides:
-        slide = prs.slides.add_slide(blank_layout)
-        
         # Notes
         if slide_data.notes:
             slide.notes_slide.notes_text_frame.text = slide_data.notes
 
+        if fragment is not None:
+            try:
+                self._import_fragment(slide, fragment, self._image_sources(slide_data))
+                return slide
+            except Exception as e:
+                print(f"⚠️ Fragmento do slide {slide_data.id} inválido ({e}); renderizando de novo.")
+
         for box in slide_data.boxes:
             if box.kind == "text":
                 txBox = slide.shapes.add_textbox(Inches(box.x), Inches(box.y), Inches(box.w), Inches(box.h))
                 tf = txBox.text_frame
                 tf.word_wrap = True
-                if box.text:
-                    p = tf.paragraphs[0]
-                    p.text = box.text
+                items = box.paragraphs if box.paragraphs is not None else ([box.text] if box.text else [])
+                for i, item in enumerate(items):
+                    # Um parágrafo por bullet, todos no corpo calculado pelo layout
+                    p = tf.paragraphs[0] if i == 0 else tf.add_paragraph()
+                    p.text = item
                     p.font.size = Pt(box.font_size)
-            
+                    if self.theme:
+                        p.font.color.rgb = RGBColor(*self.theme.text)
+
             elif box.kind == "image" and box.image_ref and box.image_ref.local_path:
                 try:
-                    slide.shapes.add_picture(box.image_ref.local_path, Inches(box.x), Inches(box.y), width=Inches(box.w), height=Inches(box.h))
+                    try:
+                        source = io.BytesIO(self._submit_image(box).result())
+                    except Exception as e:
+                        print(f"⚠️ Falha ao preparar {box.image_ref.local_path} ({e}); usando o original.")
+                        source = box.image_ref.local_path
+                    # python-pptx reaproveita a mesma parte do pacote para blobs idênticos (SHA1)
+                    slide.shapes.add_picture(source, Inches(box.x), Inches(box.y), width=Inches(box.w), height=Inches(box.h))
                 except Exception as e:
                     print(f"⚠️ Erro ao inserir imagem {box.image_ref.local_path}: {e}")
+        return slide
+
+    @staticmethod
+    def export_fragment(slide) -> str:
+        """spTree do slide com as imagens trocadas por marcadores de posição."""
+        tree = copy.deepcopy(slide._element.cSld.spTree)
+        for n, blip in enumerate(tree.iter(_A_BLIP)):
+            blip.set(_R_EMBED, f"img{n}")
+        return etree.tostring(tree, encoding="unicode")
+
+    @staticmethod
+    def _import_fragment(slide, fragment: str, images: List[io.BytesIO]):
+        tree = parse_xml(fragment)
+        blips = list(tree.iter(_A_BLIP))
+        if len(blips) != len(images):
+            raise ValueError("número de imagens difere do fragmento")
+        for blip, image in zip(blips, images):
+            _, r_id = slide.part.get_or_add_image_part(image)
+            blip.set(_R_EMBED, r_id)
+        old = slide._element.cSld.spTree
+        old.getparent().replace(old, tree)
+
+    def save(self, target: Union[str, IO[bytes]]) -> Union[str, IO[bytes]]:
+        """Grava em um caminho ou em qualquer stream binário."""
+        self.close()
+        self.prs.save(target)
+        return target
+
+    def close(self):
+        """Encerra o pool de imagens (idempotente); preparos pendentes são cancelados."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "PptxBuilder":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def render_pptx(layout_deck: LayoutDeck, filename: Union[str, IO[bytes]], image_workers: int = 4,
+                theme_id: str = "default") -> Union[str, IO[bytes]]:
+    with PptxBuilder(image_workers=image_workers, theme_id=theme_id) as builder:
+        builder.prefetch(layout_deck.slides)
+        for slide_data in layout_deck.slides:
+            builder.add_slide(slide_data)
+        return builder.save(filename)
+
+def render_pptx_incremental(layout_deck: LayoutDeck, filename: Union[str, IO[bytes]],
+                            fragments: List[Optional[str]], image_workers: int = 4,
+                            theme_id: str = "default") -> List[str]:
+    """
+    Renderiza reaproveitando o XML dos slides limpos (`fragments[i]` não-nulo)
+    e devolve o fragmento de cada slide, para o próximo build.
+    """
+    with PptxBuilder(image_workers=image_workers, theme_id=theme_id) as builder:
+        builder.prefetch(layout_deck.slides)
+        exported = []
+        for slide_data, fragment in zip(layout_deck.slides, fragments):
+            slide = builder.add_slide(slide_data, fragment=fragment)
+            # Reexporta sempre: um fragmento rejeitado não volta para o manifesto
+            exported.append(builder.export_fragment(slide))
+        builder.save(filename)
+    return exported
 
-    prs.save(filename)
-    return filename
\ No newline at end of file
+def render_pptx_bytes(layout_deck: LayoutDeck, image_workers: int = 4, theme_id: str = "default") -> bytes:
+    """Renderiza direto para memória (sem passar pelo disco)."""
+    buf = io.BytesIO()
+    render_pptx(layout_deck, buf, image_workers=image_workers, theme_id=theme_id)
+    return buf.getvalue()
@@ -1,61 +1,169 @@
 import os
 import re
+import uuid
+import threading
 import traceback
-from src.core.models import ImageRef, ContextPack
-from src.core.utils import sanitize_text
-from src.agents.manager import SlideCrewManager
-from src.services.image_gen import ImageGeneratorService
-from src.engine.layout import compute_layout
-from src.engine.renderer import render_pptx
-
-def run_pipeline(prompt: str, context_text: str, output_file: str, groq_key: str, hf_token: str = None):
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, TextIO, Tuple
+from src.core.models import AudienceType, ImageRef, ContextPack, SlideIR, DeckIR
+from src.core.build import BuildManifest, SlideBuild, input_hash, image_key, layout_hash, slide_text_hash
+from src.core.retrieval import build_context_pack
+from src.core.telemetry import get_tracer
+from src.engine.layout import LayoutDeck, LayoutSlide, compute_layout, layout_slide
+
+# Dependências pesadas (crewai, Pillow, huggingface_hub, python-pptx) são
+# importadas dentro do estágio que as usa, para o CLI iniciar rápido.
+if TYPE_CHECKING:
+    from src.agents.manager import SlideCrewManager
+    from src.services.image_gen import ImageGeneratorService
+
+def build_manager(groq_key: str, llm_cache_path: str = "output/cache/llm.sqlite", replay: bool = False,
+                  rpm: Optional[float] = None, tpm: Optional[float] = None) -> "SlideCrewManager":
+    from src.agents.manager import SlideCrewManager
+    from src.agents.llm_cache import LLMResponseCache
+    llm_cache = LLMResponseCache(path=llm_cache_path) if llm_cache_path else None
+    return SlideCrewManager(api_key=groq_key, llm_cache=llm_cache, replay=replay, rpm=rpm, tpm=tpm)
+
+def build_image_service(hf_token: str = None, image_cache_dir: str = "output/cache/images") -> "ImageGeneratorService":
+    from src.services.image_gen import ImageGeneratorService
+    from src.services.image_cache import ImageCache
+    cache = ImageCache(cache_dir=image_cache_dir) if image_cache_dir else None
+    return ImageGeneratorService(hf_token=hf_token, cache=cache)
+
+def run_pipeline(prompt: str, context_text: str, output_file: str, groq_key: str, hf_token: str = None,
+                 max_image_workers: int = 4, image_cache_dir: str = "output/cache/images",
+                 llm_cache_path: str = "output/cache/llm.sqlite", replay: bool = False,
+                 manager: "SlideCrewManager" = None, img_gen: "ImageGeneratorService" = None,
+                 streaming: bool = False, optimize_images: bool = True,
+                 context_stream: Optional[TextIO] = None, fanout: bool = False,
+                 llm_concurrency: int = 4, incremental: bool = False, deck: Optional[DeckIR] = None,
+                 qa: bool = True, on_event: Optional[Callable[[dict], None]] = None,
+                 validate_images: bool = True, rpm: Optional[float] = None, tpm: Optional[float] = None):
+    """
+    Executa o pipeline completo (texto → imagens → render).
+
+    `manager` e `img_gen` podem ser passados já construídos para reaproveitar
+    clientes e caches entre várias execuções (modo batch); caso contrário são
+    criados a partir das chaves e caminhos de cache. `rpm`/`tpm` só valem
+    para o manager criado aqui (`None` mantém os limites em vigor no processo).
+
+    `context_stream` (arquivo ou stdin) substitui `context_text` para documentos
+    grandes: o texto é lido em blocos, fatiado e indexado para recuperação.
+
+    Com `fanout=True`, o planejador roda uma vez e cada slide é escrito,
+    revisado e formatado em paralelo (até `llm_concurrency` slides por vez).
+
+    Com `streaming=True`, cada slide segue para imagem → layout → render
+    assim que o formatador o termina, em vez de esperar cada estágio acabar.
+
+    Com `incremental=True`, o manifesto `<output>.build.json` do build
+    anterior é lido e regravado: o texto só é refeito se prompt/contexto
+    mudaram, e imagem, layout e XML renderizado só para os slides cujo hash
+    mudou. `deck` (ex.: um DeckIR editado à mão) pula os estágios de LLM.
+
+    Com `qa=True`, as regras editoriais (`Constraints` do contexto) rodam
+    como gate antes do render e as correções automáticas são aplicadas.
+
+    Com `validate_images=True`, as imagens prontas passam pelo validador
+    (arquivo, imagem lisa/escura, duplicatas entre slides) e só os slides
+    reprovados são regerados, com uma variação do prompt.
+
+    `on_event` recebe eventos de progresso (`{"event": "stage"|"slide", ...}`)
+    por estágio e por slide; é chamado da thread do pipeline.
+    """
     print(f"🌟 Iniciando Pipeline Debug: '{prompt}'")
+    tracer = get_tracer()
     
-    match = re.search(r'(\d+)\s+slides', prompt.lower())
-    num_slides = int(match.group(1)) if match else 5
+    num_slides = _target_slides(prompt)
     print(f"   🔢 Alvo Detectado: {num_slides} slides.")
 
-    ctx = ContextPack(
-        prompt=prompt, 
-        source_text=context_text, 
-        cleaned_text=sanitize_text(context_text)
-    )
+    # Documentos grandes (arquivo/stdin) chegam como stream e são fatiados sem carregar tudo
+    source = context_stream if context_stream is not None else context_text
+    with tracer.span("context.ingest") as span:
+        ctx = build_context_pack(prompt, source)
+        span["chunks"] = len(ctx.chunks)
+    _emit(on_event, "stage", stage="context", status="done", chunks=len(ctx.chunks))
+    print(f"   📚 Contexto: {len(ctx.chunks)} trechos indexáveis.")
     ctx.meta['num_slides'] = num_slides
 
+    manifest_path = BuildManifest.path_for(output_file)
+    previous = BuildManifest.load(manifest_path) if incremental else None
+    build_key = input_hash(prompt, ctx.cleaned_text, num_slides, fanout)
+    reuse_images = deck is not None or previous is not None
+    if deck is None and previous and previous.input_hash == build_key and previous.deck:
+        deck = previous.deck
+        print("   ♻️ Texto reaproveitado do build anterior (prompt e contexto inalterados).")
+        tracer.incr("incremental_text_reused")
+
+    if streaming and deck is None:
+        if incremental:
+            print("   ⚠️ Modo streaming não grava o manifesto de build; o próximo build incremental refará tudo.")
+        if manager is None:
+            manager = build_manager(groq_key, llm_cache_path, replay, rpm=rpm, tpm=tpm)
+        if img_gen is None:
+            img_gen = build_image_service(hf_token, image_cache_dir)
+        return _run_streaming(ctx, output_file, manager, img_gen, max_image_workers,
+                              fanout=fanout, llm_concurrency=llm_concurrency, qa=qa, on_event=on_event,
+                              optimize_images=optimize_images, validate_images=validate_images)
+
     # 1. CrewAI
-    try:
-        print("\n🤖 1. Gerando Conteúdo Textual...")
-        manager = SlideCrewManager(api_key=groq_key)
-        deck = manager.run_crew(ctx)
-    except Exception as e:
-        print(f"\n❌ [FATAL] Erro no CrewAI ou Parsing:")
-        print(f"   Mensagem: {e}")
-        print("-" * 30)
-        traceback.print_exc()
-        print("-" * 30)
-        return None
+    if deck is not None:
+        print(f"\n🤖 1. Conteúdo Textual: usando DeckIR existente ({len(deck.slides)} slides).")
+    else:
+        try:
+            print("\n🤖 1. Gerando Conteúdo Textual...")
+            _emit(on_event, "stage", stage="crew", status="start", num_slides=num_slides)
+            if manager is None:
+                manager = build_manager(groq_key, llm_cache_path, replay, rpm=rpm, tpm=tpm)
+            with tracer.span("crew", num_slides=num_slides, fanout=fanout):
+                if fanout:
+                    deck = manager.run_fanout(ctx, max_concurrency=llm_concurrency)
+                else:
+                    deck = manager.run_crew(ctx)
+            if manager.llm_cache:
+                st = manager.llm_cache.stats()
+                print(f"   📦 Cache do LLM: {st['hits']} hits / {st['misses']} misses.")
+        except Exception as e:
+            print(f"\n❌ [FATAL] Erro no CrewAI ou Parsing:")
+            print(f"   Mensagem: {e}")
+            print("-" * 30)
+            traceback.print_exc()
+            print("-" * 30)
+            _emit(on_event, "stage", stage="crew", status="error", error=str(e))
+            return None
+    _emit(on_event, "stage", stage="crew", status="done", slides=len(deck.slides))
 
     # 2. Imagens
     print("\n🖼️ 2. Gerando Imagens Contextuais...")
     try:
-        img_gen = ImageGeneratorService(hf_token=hf_token)
-        for i, s in enumerate(deck.slides):
-            if not s.image: s.image = ImageRef(status="missing")
-            
-            if not s.image.prompt:
-                # Fallback seguro se não houver bullets
-                context_preview = ". ".join(s.bullets[:2]) if s.bullets else s.title
-                s.image.prompt = (
-                    f"Professional illustration, cinematic lighting, 8k. "
-                    f"Subject: {s.title}. Context: {context_preview}. "
-                    f"Style: Futuristic Minimalism."
-                )
+        if img_gen is None:
+            img_gen = build_image_service(hf_token, image_cache_dir)
+        cache = img_gen.cache
+        if reuse_images:
+            _reuse_images(deck, previous)
+        pending = []
+        for s in deck.slides:
+            _ensure_image_prompt(s)
             
             if s.image.status != "ready":
-                print(f"   🎨 Processando Slide {i+1}...")
-                path = img_gen.generate(s.image.prompt, s.id)
-                s.image.local_path = path
-                s.image.status = "ready"
+                s.image.status = "generating"
+                pending.append(s)
+
+        # Despacha todas as imagens de uma vez; cada resultado volta ao slide assim que termina
+        by_id = {s.id: s for s in pending}
+        jobs = [(s.id, s.image.prompt, s.image.aspect_ratio, deck.meta.theme_id) for s in pending]
+        print(f"   🎨 Processando {len(jobs)} imagens ({max_image_workers} em paralelo)...")
+        _emit(on_event, "stage", stage="images", status="start", count=len(jobs))
+        with tracer.span("images", count=len(jobs), workers=max_image_workers):
+            for slide_id, path, error in img_gen.generate_many(jobs, max_workers=max_image_workers):
+                _apply_image_result(by_id[slide_id], path, error)
+                _emit(on_event, "slide", stage="image", slide_id=slide_id, status=by_id[slide_id].image.status)
+        if validate_images:
+            _validate_images(deck, img_gen, max_image_workers, on_event)
+        if cache:
+            st = cache.stats()
+            print(f"   📦 Cache de imagens: {st['hits']} hits / {st['misses']} misses ({st['entries']} arquivos).")
     except Exception as e:
         print(f"⚠️ Erro não-fatal nas imagens: {e}")
         traceback.print_exc()
@@ -63,11 +171,579 @@ def run_pipeline(prompt: str, context_text: str, output_file: str, groq_key: str
     # 3. Render
     print("\n🎨 3. Renderizando...")
     try:
-        layout = compute_layout(deck)
-        final_path = render_pptx(layout, output_file)
-        print(f"🏆 Concluído: {os.path.abspath(final_path)}")
-        return final_path
+        from src.engine.renderer import render_pptx, render_pptx_incremental
+        if qa:
+            deck = _run_qa_gate(deck, ctx.constraints)
+            _emit(on_event, "stage", stage="qa", status="done")
+        _emit(on_event, "stage", stage="render", status="start", slides=len(deck.slides))
+        if not incremental:
+            with tracer.span("layout", slides=len(deck.slides)):
+                layout = compute_layout(deck)
+            if optimize_images:
+                _optimize_images(layout)
+            with tracer.span("render", slides=len(layout.slides)):
+                final_path = render_pptx(layout, output_file, theme_id=deck.meta.theme_id)
+            print(f"🏆 Concluído: {os.path.abspath(final_path)}")
+            _emit(on_event, "stage", stage="render", status="done")
+            return final_path
+
+        salt = "opt" if optimize_images else "raw"
+        if deck.meta.theme_id != "default":
+            # A cor do texto fica no XML do slide: trocar o tema invalida os fragmentos
+            salt = f"{salt}:{deck.meta.theme_id}"
+        with tracer.span("layout", slides=len(deck.slides), incremental=True) as span:
+            layout, fragments, hashes, dirty = _incremental_layout(deck, previous, salt)
+            span["dirty"] = len(dirty)
+        print(f"   ♻️ Incremental: {len(deck.slides) - len(dirty)}/{len(deck.slides)} slides reaproveitados "
+              f"(layout e XML).")
+        tracer.incr("incremental_slides_reused", len(deck.slides) - len(dirty))
+        if optimize_images and dirty:
+            _optimize_images(LayoutDeck.model_construct(slides=dirty))
+        with tracer.span("render", slides=len(layout.slides), incremental=True):
+            fragments = render_pptx_incremental(layout, output_file, fragments, theme_id=deck.meta.theme_id)
+        BuildManifest(
+            input_hash=build_key,
+            deck=deck,
+            slides=[SlideBuild(id=s.id, text_hash=slide_text_hash(s), image_key=image_key(s),
+                               image_path=s.image.local_path if s.image and s.image.status == "ready" else None,
+                               layout_hash=h, layout=ls.model_dump(mode="json"), fragment=fragment)
+                    for s, ls, h, fragment in zip(deck.slides, layout.slides, hashes, fragments)],
+        ).save(manifest_path)
+        print(f"🏆 Concluído: {os.path.abspath(output_file)} (manifesto em {manifest_path})")
+        _emit(on_event, "stage", stage="render", status="done", reused=len(deck.slides) - len(dirty))
+        return output_file
     except Exception as e:
         print(f"❌ [FATAL] Erro no Renderizador:")
         traceback.print_exc()
-        return None
\ No newline at end of file
+        return None
+
+def run_variants(prompt: str, context_text: str, output_file: str, groq_key: str, hf_token: str = None,
+                 audiences: Optional[List[AudienceType]] = None, themes: Optional[List[str]] = None,
+                 max_image_workers: int = 4, image_cache_dir: str = "output/cache/images",
+                 llm_cache_path: str = "output/cache/llm.sqlite", replay: bool = False,
+                 manager: "SlideCrewManager" = None, img_gen: "ImageGeneratorService" = None,
+                 context_stream: Optional[TextIO] = None, llm_concurrency: Optional[int] = None,
+                 optimize_images: bool = True, qa: bool = True, validate_images: bool = True,
+                 render_workers: Optional[int] = None, on_event: Optional[Callable[[dict], None]] = None,
+                 rpm: Optional[float] = None, tpm: Optional[float] = None) -> Dict[Tuple[AudienceType, str], str]:
+    """
+    Gera várias versões do mesmo deck (público × tema) com um só planejamento.
+
+    Rodam uma vez: ingestão e índice do contexto, Planejador, trechos por
+    slide, geração/validação das imagens e a otimização delas. Por público:
+    redação, revisão e formatação (em paralelo, até `llm_concurrency`), QA e
+    layout. Por (público, tema): só o render, em paralelo.
+
+    Cada versão vai para `variant_path(output_file, público, tema)`; devolve
+    `{(público, tema): caminho}` só com as que foram renderizadas.
+    """
+    audiences = list(dict.fromkeys(audiences or [AudienceType.MIXED]))
+    themes = list(dict.fromkeys(themes or ["default"]))
+    print(f"🌟 Iniciando Variantes: '{prompt}' ({len(audiences)} públicos × {len(themes)} temas)")
+    tracer = get_tracer()
+
+    num_slides = _target_slides(prompt)
+    print(f"   🔢 Alvo Detectado: {num_slides} slides.")
+    source = context_stream if context_stream is not None else context_text
+    with tracer.span("context.ingest") as span:
+        ctx = build_context_pack(prompt, source)
+        span["chunks"] = len(ctx.chunks)
+    _emit(on_event, "stage", stage="context", status="done", chunks=len(ctx.chunks))
+    ctx.meta['num_slides'] = num_slides
+
+    # 1. CrewAI: um plano, um texto por público
+    try:
+        print("\n🤖 1. Gerando Conteúdo Textual (plano único, texto por público)...")
+        _emit(on_event, "stage", stage="crew", status="start", num_slides=num_slides, audiences=len(audiences))
+        if manager is None:
+            manager = build_manager(groq_key, llm_cache_path, replay, rpm=rpm, tpm=tpm)
+        with tracer.span("crew", num_slides=num_slides, audiences=len(audiences)):
+            decks = manager.run_variants(ctx, audiences, max_concurrency=llm_concurrency)
+        if manager.llm_cache:
+            st = manager.llm_cache.stats()
+            print(f"   📦 Cache do LLM: {st['hits']} hits / {st['misses']} misses.")
+    except Exception as e:
+        print(f"\n❌ [FATAL] Erro no CrewAI ou Parsing: {e}")
+        traceback.print_exc()
+        _emit(on_event, "stage", stage="crew", status="error", error=str(e))
+        return {}
+    if not decks:
+        print("❌ Nenhuma variante gerada.")
+        _emit(on_event, "stage", stage="crew", status="error", error="nenhuma variante gerada")
+        return {}
+    _emit(on_event, "stage", stage="crew", status="done", variants=len(decks))
+
+    # 2. Imagens: uma geração para todas as versões
+    print("\n🖼️ 2. Gerando Imagens Compartilhadas...")
+    try:
+        if img_gen is None:
+            img_gen = build_image_service(hf_token, image_cache_dir)
+        _shared_images(list(decks.values()), img_gen, themes[0], max_image_workers, validate_images, on_event)
+        if img_gen.cache:
+            st = img_gen.cache.stats()
+            print(f"   📦 Cache de imagens: {st['hits']} hits / {st['misses']} misses ({st['entries']} arquivos).")
+    except Exception as e:
+        print(f"⚠️ Erro não-fatal nas imagens: {e}")
+        traceback.print_exc()
+
+    # 3. QA e layout por público (o tema não muda as caixas), render por (público, tema)
+    print("\n🎨 3. Renderizando Variantes...")
+    try:
+        from src.engine.renderer import render_pptx
+        layouts = {}
+        for audience, deck in decks.items():
+            if qa:
+                deck = _run_qa_gate(deck, ctx.constraints)
+            with tracer.span("layout", slides=len(deck.slides), audience=audience.value):
+                layouts[audience] = compute_layout(deck)
+        if optimize_images:
+            # Um lote só: a mesma imagem na mesma caixa é otimizada uma vez para todas as versões
+            _optimize_images(LayoutDeck.model_construct(slides=[ls for l in layouts.values() for ls in l.slides]))
+    except Exception as e:
+        print(f"❌ [FATAL] Erro no Layout:")
+        traceback.print_exc()
+        return {}
+
+    combos = [(a, t) for a in layouts for t in themes]
+    _emit(on_event, "stage", stage="render", status="start", variants=len(combos))
+
+    def _render(audience: AudienceType, theme_id: str) -> str:
+        layout = layouts[audience]
+        with tracer.span("render", slides=len(layout.slides), audience=audience.value, theme=theme_id):
+            return render_pptx(layout, variant_path(output_file, audience, theme_id), theme_id=theme_id)
+
+    results = {}
+    workers = max(1, min(render_workers or len(combos), len(combos)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="variantrender") as pool:
+        futures = {pool.submit(_render, a, t): (a, t) for a, t in combos}
+        for future in as_completed(futures):
+            audience, theme_id = futures[future]
+            try:
+                results[(audience, theme_id)] = future.result()
+            except Exception as e:
+                print(f"❌ Erro ao renderizar a variante {audience.value}/{theme_id}: {e}")
+                traceback.print_exc()
+                _emit(on_event, "variant", audience=audience.value, theme=theme_id, status="error", error=str(e))
+                continue
+            print(f"🏆 Variante {audience.value}/{theme_id}: {os.path.abspath(results[(audience, theme_id)])}")
+            _emit(on_event, "variant", audience=audience.value, theme=theme_id, status="done",
+                  path=results[(audience, theme_id)])
+    _emit(on_event, "stage", stage="render", status="done", variants=len(results))
+    return {k: results[k] for k in combos if k in results}
+
+def variant_path(output_file: str, audience: AudienceType, theme_id: str) -> str:
+    """`deck.pptx` → `deck_executive_dark.pptx` (nome do enum: sem acentos no arquivo)."""
+    p = Path(output_file)
+    return str(p.with_name(f"{p.stem}_{audience.name.lower()}_{theme_id}{p.suffix or '.pptx'}"))
+
+def _shared_images(decks: List[DeckIR], img_gen: "ImageGeneratorService", theme_id: str, max_workers: int,
+                   validate: bool = True, on_event: Optional[Callable[[dict], None]] = None):
+    """
+    Gera (e valida) as imagens uma vez para todas as versões do deck.
+
+    As versões seguem o mesmo roteiro, então a posição i usa o prompt do
+    slide i da primeira versão que o tem e, no fim, todas apontam para o
+    mesmo ImageRef. Placeholders do fallback saem no primeiro tema.
+    """
+    tracer = get_tracer()
+    owners: List[SlideIR] = []
+    for deck in decks:
+        owners.extend(deck.slides[len(owners):])
+    shared = DeckIR.model_construct(meta=decks[0].meta.model_copy(update={"theme_id": theme_id}), slides=owners)
+
+    pending = []
+    for s in owners:
+        _ensure_image_prompt(s)
+        if s.image.status != "ready":
+            s.image.status = "generating"
+            pending.append(s)
+    by_id = {s.id: s for s in pending}
+    jobs = [(s.id, s.image.prompt, s.image.aspect_ratio, theme_id) for s in pending]
+    print(f"   🎨 Processando {len(jobs)} imagens para {len(decks)} variantes ({max_workers} em paralelo)...")
+    _emit(on_event, "stage", stage="images", status="start", count=len(jobs))
+    with tracer.span("images", count=len(jobs), workers=max_workers, variants=len(decks)):
+        for slide_id, path, error in img_gen.generate_many(jobs, max_workers=max_workers):
+            _apply_image_result(by_id[slide_id], path, error)
+            _emit(on_event, "slide", stage="image", slide_id=slide_id, status=by_id[slide_id].image.status)
+    if validate:
+        _validate_images(shared, img_gen, max_workers, on_event)
+
+    # Depois da validação: uma regeneração que falhou pode ter trocado o ImageRef do slide
+    for deck in decks:
+        for s, owner in zip(deck.slides, owners):
+            s.image = owner.image
+    tracer.incr("variant_images_shared", sum(len(d.slides) for d in decks) - len(owners))
+
+def _target_slides(prompt: str) -> int:
+    """Número de slides pedido no prompt ("... 8 slides ..."); 5 por padrão."""
+    match = re.search(r'(\d+)\s+slides', prompt.lower())
+    return int(match.group(1)) if match else 5
+
+def _emit(on_event: Optional[Callable[[dict], None]], kind: str, **data):
+    """Publica um evento de progresso; falhas do consumidor não derrubam o pipeline."""
+    if on_event is None:
+        return
+    try:
+        on_event({"event": kind, **data})
+    except Exception as e:
+        print(f"   ⚠️ Consumidor de eventos falhou: {e}")
+
+def _ensure_image_prompt(s: SlideIR) -> str:
+    """Garante um ImageRef com prompt no slide e devolve o prompt."""
+    if not s.image: s.image = ImageRef(status="missing")
+    
+    if not s.image.prompt:
+        # Fallback seguro se não houver bullets
+        context_preview = ". ".join(s.bullets[:2]) if s.bullets else s.title
+        s.image.prompt = (
+            f"Professional illustration, cinematic lighting, 8k. "
+            f"Subject: {s.title}. Context: {context_preview}. "
+            f"Style: Futuristic Minimalism."
+        )
+    return s.image.prompt
+
+def _apply_image_result(s: SlideIR, path: str, error: Exception = None):
+    image = s.image
+    if error:
+        print(f"   ⚠️ Falha na imagem do slide {s.id}: {error!r}")
+        get_tracer().incr("image_errors")
+        image.status = "error"
+        return
+    image.local_path = path
+    image.uri = Path(path).resolve().as_uri()
+    image.status = "ready"
+    print(f"   ✅ Imagem pronta: slide {s.id}")
+
+IMAGE_REGEN_ROUNDS = 1
+
+def _variant_prompt(prompt: str, variant: int) -> str:
+    """Prompt enviado ao modelo na regeneração (o slide guarda o original)."""
+    return f"{prompt} (variation {variant})"
+
+def _validate_images(deck: DeckIR, img_gen: "ImageGeneratorService", max_workers: int,
+                     on_event: Optional[Callable[[dict], None]] = None, rounds: int = IMAGE_REGEN_ROUNDS):
+    """
+    Valida as imagens prontas do deck e regera só as reprovadas (não-fatal).
+
+    Sem cliente HF não roda: tudo é placeholder do fallback local, que é
+    liso e determinístico (reprovaria sempre e regerar não muda nada).
+    Depois de `rounds` rodadas a imagem reprovada fica no slide, com aviso.
+
+    O slide mantém o prompt original (é ele que vai para o manifesto); a
+    regeneração usa um sufixo de variação e um sal novo por execução na
+    chave do cache. A imagem reprovada só deixa de ser referenciada por este
+    deck: "duplicada" é um veredito do deck, e outro deck do processo (batch,
+    servidor) pode estar usando o mesmo arquivo do cache. A remoção fica
+    com o LRU do cache.
+    """
+    if not img_gen.hf_client:
+        return
+    from src.services.image_val import get_validator
+    tracer = get_tracer()
+    validator = get_validator()
+    run_salt = uuid.uuid4().hex[:12]
+    try:
+        for attempt in range(rounds + 1):
+            ready = [(s.id, s.image.local_path) for s in deck.slides if s.image and s.image.status == "ready"]
+            checks = validator.validate_many(ready, max_workers=max_workers)
+            failed = [s for s in deck.slides if s.id in checks and not checks[s.id].ok]
+            if not failed:
+                return
+            for s in failed:
+                check = checks[s.id]
+                for issue in check.issues:
+                    tracer.incr("image_rejected", issue=issue)
+                detail = f" (igual a {check.duplicate_of})" if check.duplicate_of else ""
+                print(f"   🔎 Imagem do slide {s.id} reprovada: {', '.join(check.issues)}{detail}.")
+            if attempt == rounds:
+                print(f"   ⚠️ {len(failed)} imagens reprovadas mantidas no deck.")
+                return
+
+            by_id = {s.id: s for s in failed}
+            # Se a regeneração falhar, a imagem reprovada volta (melhor que slide sem imagem)
+            previous = {s.id: s.image.model_copy() for s in failed}
+            jobs = []
+            for s in failed:
+                s.image.status = "generating"
+                jobs.append((s.id, _variant_prompt(s.image.prompt, attempt + 1), s.image.aspect_ratio,
+                             deck.meta.theme_id, f"regen:{run_salt}:{attempt + 1}"))
+            print(f"   🔁 Regerando {len(jobs)} imagens reprovadas...")
+            _emit(on_event, "stage", stage="images", status="regenerate", count=len(jobs))
+            tracer.incr("images_regenerated", len(jobs))
+            for slide_id, path, error in img_gen.generate_many(jobs, max_workers=max_workers):
+                _apply_image_result(by_id[slide_id], path, error)
+                if error:
+                    by_id[slide_id].image = previous[slide_id]
+                _emit(on_event, "slide", stage="image", slide_id=slide_id, status=by_id[slide_id].image.status)
+    except Exception as e:
+        print(f"   ⚠️ Validação de imagens ignorada: {e}")
+
+class _StreamImageValidation:
+    """
+    `_validate_images` slide a slide, para o streaming: a imagem é checada
+    assim que chega (e contra as dos slides já renderizados, para as
+    duplicatas) e, se reprovada, regerada na hora, antes do render do slide.
+    """
+
+    def __init__(self, img_gen: "ImageGeneratorService", theme_id: str,
+                 on_event: Optional[Callable[[dict], None]] = None, rounds: int = IMAGE_REGEN_ROUNDS):
+        self.img_gen = img_gen
+        self.theme_id = theme_id
+        self.on_event = on_event
+        self.rounds = rounds
+        self.run_salt = uuid.uuid4().hex[:12]
+        # (slide_id, pHash) das imagens aceitas, na ordem do deck
+        self.seen: List[Tuple[str, int]] = []
+        self.validator = None
+        if img_gen.hf_client:
+            from src.services.image_val import get_validator
+            self.validator = get_validator()
+
+    def _check(self, path: str):
+        from src.services.image_val import hamming
+        check = self.validator.check(path)
+        if check.ok and check.phash is not None:
+            original = next((sid for sid, h in self.seen
+                             if hamming(h, check.phash) <= self.validator.duplicate_distance), None)
+            if original:
+                check = check.model_copy(update={"ok": False, "issues": [*check.issues, "duplicate"],
+                                                 "duplicate_of": original})
+        return check
+
+    def check(self, s: SlideIR):
+        """Valida (e regera, se preciso) a imagem pronta do slide; não-fatal."""
+        if self.validator is None or not (s.image and s.image.status == "ready"):
+            return
+        tracer = get_tracer()
+        try:
+            for attempt in range(self.rounds + 1):
+                check = self._check(s.image.local_path)
+                if check.ok:
+                    break
+                for issue in check.issues:
+                    tracer.incr("image_rejected", issue=issue)
+                detail = f" (igual a {check.duplicate_of})" if check.duplicate_of else ""
+                print(f"   🔎 Imagem do slide {s.id} reprovada: {', '.join(check.issues)}{detail}.")
+                if attempt == self.rounds:
+                    print(f"   ⚠️ Imagem reprovada mantida no slide {s.id}.")
+                    return
+                # Se a regeneração falhar, a imagem reprovada volta (melhor que slide sem imagem)
+                previous = s.image.model_copy()
+                tracer.incr("images_regenerated")
+                try:
+                    path = self.img_gen.generate(_variant_prompt(s.image.prompt, attempt + 1), s.id,
+                                                 s.image.aspect_ratio, self.theme_id,
+                                                 variant=f"regen:{self.run_salt}:{attempt + 1}")
+                    _apply_image_result(s, path)
+                except Exception as e:
+                    _apply_image_result(s, None, e)
+                    s.image = previous
+                    return
+                _emit(self.on_event, "slide", stage="image", slide_id=s.id, status=s.image.status)
+            if check.phash is not None:
+                self.seen.append((s.id, check.phash))
+        except Exception as e:
+            print(f"   ⚠️ Validação da imagem do slide {s.id} ignorada: {e}")
+
+def _reuse_images(deck: DeckIR, previous: Optional[BuildManifest]):
+    """
+    Marca como prontas as imagens cujo prompt já foi gerado no build anterior.
+    Com manifesto, qualquer outra imagem volta a 'missing' (o prompt pode ter
+    sido editado sem trocar o arquivo); sem manifesto, vale o arquivo do DeckIR.
+    """
+    known = previous.image_paths() if previous else {}
+    reused = 0
+    for s in deck.slides:
+        _ensure_image_prompt(s)
+        path = known.get(image_key(s))
+        if path:
+            s.image.local_path = path
+            s.image.uri = Path(path).resolve().as_uri()
+            s.image.status = "ready"
+            reused += 1
+        elif previous is not None or not (s.image.local_path and Path(s.image.local_path).exists()):
+            s.image.status = "missing"
+    if reused:
+        print(f"   ♻️ {reused} imagens reaproveitadas do build anterior.")
+        get_tracer().incr("incremental_images_reused", reused)
+
+def _incremental_layout(deck: DeckIR, previous: Optional[BuildManifest], salt: str):
+    """
+    Reaproveita caixas e XML renderizado dos slides cujo hash de layout não
+    mudou. Devolve (layout, fragmentos, hashes, slides_sujos).
+    """
+    cached = previous.by_layout() if previous else {}
+    slides, fragments, hashes, dirty = [], [], [], []
+    for s in deck.slides:
+        h = layout_hash(s, salt)
+        entry = cached.get(h)
+        ls = LayoutSlide.model_validate({**entry.layout, "id": s.id}) if entry else None
+        # A imagem otimizada do build anterior pode ter sido apagada
+        if ls and not all(Path(b.image_ref.local_path).exists() for b in ls.boxes
+                          if b.kind == "image" and b.image_ref and b.image_ref.local_path):
+            ls = None
+        if ls is None:
+            ls = layout_slide(s)
+            dirty.append(ls)
+            fragments.append(None)
+        else:
+            fragments.append(entry.fragment)
+        slides.append(ls)
+        hashes.append(h)
+    return LayoutDeck.model_construct(slides=slides), fragments, hashes, dirty
+
+def _run_qa_gate(deck: DeckIR, constraints) -> DeckIR:
+    """QA editorial antes do render: aplica as correções automáticas e só avisa o resto (não-fatal)."""
+    from src.engine.qa import qa_gate
+    tracer = get_tracer()
+    try:
+        with tracer.span("qa", slides=len(deck.slides)) as span:
+            fixed, envelope = qa_gate(deck, constraints)
+            span["tickets"] = len(envelope.tickets)
+    except Exception as e:
+        print(f"   ⚠️ QA editorial ignorado: {e}")
+        return deck
+    changed = sum(a is not b for a, b in zip(deck.slides, fixed.slides))
+    if changed:
+        print(f"   🧪 QA: {changed} slides corrigidos automaticamente.")
+        tracer.incr("qa_fixed_slides", changed)
+    for t in envelope.tickets:
+        tracer.incr("qa_tickets", issue=t.issue_code)
+    if envelope.tickets:
+        shown = ", ".join(f"{t.issue_code}@{t.target.slide_id or 'deck'}" for t in envelope.tickets[:5])
+        more = f" (+{len(envelope.tickets) - 5})" if len(envelope.tickets) > 5 else ""
+        print(f"   🧪 QA: pendências sem correção automática: {shown}{more}")
+    return fixed
+
+def _optimize_images(layout, report=None):
+    """
+    Reduz/recomprime as imagens para o tamanho da caixa antes do render (não-fatal).
+
+    Com `report` (um ImageOptimizationReport), soma nele em vez de imprimir o
+    resumo: o streaming otimiza slide a slide e resume no fim.
+    """
+    from src.services.image_opt import optimize_layout_images
+    try:
+        with get_tracer().span("images.optimize") as span:
+            result = optimize_layout_images(layout)
+            span["bytes_saved"] = result.bytes_saved
+        get_tracer().incr("image_bytes_saved", result.bytes_saved)
+        if report is not None:
+            report.images += result.images
+            report.bytes_before += result.bytes_before
+            report.bytes_after += result.bytes_after
+            return
+        _print_optimization(result)
+    except Exception as e:
+        print(f"   ⚠️ Otimização de imagens ignorada: {e}")
+
+def _print_optimization(report):
+    if report.images:
+        print(f"   🗜️ Imagens otimizadas: {report.images} arquivos, "
+              f"{report.bytes_before / 1e6:.2f} MB → {report.bytes_after / 1e6:.2f} MB "
+              f"({report.bytes_saved / 1e6:.2f} MB economizados).")
+
+def _run_streaming(ctx: ContextPack, output_file: str, manager: "SlideCrewManager",
+                   img_gen: "ImageGeneratorService", max_image_workers: int,
+                   fanout: bool = False, llm_concurrency: int = 4, qa: bool = True,
+                   on_event: Optional[Callable[[dict], None]] = None, theme_id: str = "default",
+                   optimize_images: bool = True, validate_images: bool = True):
+    """
+    Pipeline em fluxo: a imagem de cada slide é despachada assim que o slide
+    sai do stream do formatador, e o render avança slide a slide conforme as
+    imagens ficam prontas. Antes de entrar na apresentação, cada slide passa
+    pelo validador (`validate_images`, com duplicatas contra os slides
+    anteriores) e pelo otimizador (`optimize_images`).
+    """
+    tracer = get_tracer()
+    pool = ThreadPoolExecutor(max_workers=max(1, img_gen.concurrency(max_image_workers)), thread_name_prefix="imggen")
+    # índice -> ((prompt, tema), future); o meta do deck só chega no fim, então as
+    # imagens antecipadas usam `theme_id` e só valem se o deck final tiver o mesmo tema
+    early = {}
+    lock = threading.Lock()
+
+    def on_slide(index: int, data: dict):
+        try:
+            slide = SlideIR(**data)
+        except Exception:
+            # Slide ainda inválido: será tratado com o deck final (pós auto-healing)
+            return
+        prompt = _ensure_image_prompt(slide)
+        if slide.image.status == "ready":
+            return
+        with lock:
+            early[index] = ((prompt, theme_id),
+                            pool.submit(img_gen.generate, prompt, slide.id, slide.image.aspect_ratio, theme_id))
+        tracer.incr("stream_early_images")
+        print(f"   ⚡ Slide {index + 1} recebido no stream: imagem despachada.")
+        _emit(on_event, "slide", stage="text", index=index, slide_id=slide.id)
+
+    try:
+        # 1. CrewAI (o formatador alimenta `on_slide` durante a geração)
+        try:
+            print("\n🤖 1. Gerando Conteúdo Textual (streaming)...")
+            _emit(on_event, "stage", stage="crew", status="start", num_slides=ctx.meta.get('num_slides'))
+            with tracer.span("crew", num_slides=ctx.meta.get('num_slides'), streaming=True):
+                if fanout:
+                    deck = manager.run_fanout(ctx, max_concurrency=llm_concurrency, on_slide=on_slide)
+                else:
+                    deck = manager.run_crew(ctx, on_slide=on_slide)
+        except Exception as e:
+            print(f"\n❌ [FATAL] Erro no CrewAI ou Parsing:")
+            print(f"   Mensagem: {e}")
+            traceback.print_exc()
+            _emit(on_event, "stage", stage="crew", status="error", error=str(e))
+            return None
+        _emit(on_event, "stage", stage="crew", status="done", slides=len(deck.slides))
+
+        # 2+3. Imagens, layout e render incrementais
+        print("\n🖼️ 2-3. Imagens e Renderização Incrementais...")
+        futures = []
+        for i, s in enumerate(deck.slides):
+            prompt = _ensure_image_prompt(s)
+            if s.image.status == "ready":
+                futures.append(None)
+                continue
+            s.image.status = "generating"
+            with lock:
+                submitted = early.get(i)
+            if submitted and submitted[0] == (prompt, deck.meta.theme_id):
+                futures.append(submitted[1])
+            else:
+                futures.append(pool.submit(img_gen.generate, prompt, s.id, s.image.aspect_ratio, deck.meta.theme_id))
+
+        # Depois dos prompts de imagem: correções de texto não invalidam as imagens despachadas
+        if qa:
+            deck = _run_qa_gate(deck, ctx.constraints)
+
+        try:
+            from src.engine.renderer import PptxBuilder
+            from src.services.image_opt import ImageOptimizationReport
+            optimized = ImageOptimizationReport()
+            validation = _StreamImageValidation(img_gen, deck.meta.theme_id, on_event) if validate_images else None
+            with PptxBuilder(theme_id=deck.meta.theme_id) as builder, \
+                    tracer.span("images+render", slides=len(deck.slides), streaming=True):
+                for s, future in zip(deck.slides, futures):
+                    if future is not None:
+                        try:
+                            _apply_image_result(s, future.result())
+                        except Exception as e:
+                            _apply_image_result(s, None, e)
+                    if validation:
+                        validation.check(s)
+                    ls = layout_slide(s)
+                    if optimize_images:
+                        _optimize_images(LayoutDeck.model_construct(slides=[ls]), report=optimized)
+                    builder.add_slide(ls)
+                    _emit(on_event, "slide", stage="render", slide_id=s.id, image=s.image.status)
+                final_path = builder.save(output_file)
+            _print_optimization(optimized)
+            print(f"🏆 Concluído: {os.path.abspath(final_path)}")
+            _emit(on_event, "stage", stage="render", status="done")
+            return final_path
+        except Exception as e:
+            print(f"❌ [FATAL] Erro no Renderizador:")
+            traceback.print_exc()
+            return None
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,330 @@
+import io
+import json
+import time
+import uuid
+import asyncio
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from typing import Dict, List, Optional
+from pydantic import BaseModel, ValidationError
+from src.pipeline import run_pipeline, build_manager, build_image_service
+
+MAX_BODY_BYTES = 20 * 1024 * 1024
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            409: "Conflict", 413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error"}
+
+class DeckRequest(BaseModel):
+    """Corpo do POST /decks."""
+    prompt: str
+    context: str = ""
+    fanout: bool = False
+    streaming: bool = False
+    qa: bool = True
+
+class DeckJob:
+    """Estado de um deck no servidor. Só é alterado na thread do event loop."""
+
+    def __init__(self, job_id: str, request: DeckRequest):
+        self.id = job_id
+        self.request = request
+        self.status = "queued"  # queued | running | done | failed
+        self.error: Optional[str] = None
+        self.pptx: Optional[bytes] = None
+        self.events: List[dict] = []
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self._subscribers: List[asyncio.Queue] = []
+
+    def publish(self, event: dict):
+        event = {"job_id": self.id, "t": round(time.time() - self.created, 3), **event}
+        self.events.append(event)
+        for q in self._subscribers:
+            q.put_nowait(event)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Fila com o histórico já publicado seguido dos eventos ao vivo; None marca o fim."""
+        q: asyncio.Queue = asyncio.Queue()
+        for event in self.events:
+            q.put_nowait(event)
+        if self.finished:
+            q.put_nowait(None)
+        else:
+            self._subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue):
+        with suppress(ValueError):
+            self._subscribers.remove(q)
+
+    def finish(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        self.finished = time.time()
+        self.publish({"event": "job", "status": status, "error": error,
+                      "seconds": round(self.finished - self.created, 3),
+                      "bytes": len(self.pptx) if self.pptx else 0})
+        for q in self._subscribers:
+            q.put_nowait(None)
+        self._subscribers.clear()
+
+    def summary(self) -> dict:
+        return {"job_id": self.id, "status": self.status, "error": self.error, "prompt": self.request.prompt,
+                "events": len(self.events), "bytes": len(self.pptx) if self.pptx else 0}
+
+class DeckServer:
+    """
+    Modo serviço: servidor HTTP asyncio que mantém o manager (LLM + cache),
+    o serviço de imagens e os caches quentes entre pedidos.
+
+    Endpoints:
+        POST /decks               DeckRequest em JSON → 202 {"job_id"}; 429 com a fila cheia
+        GET  /decks/<id>          estado do job
+        GET  /decks/<id>/events   progresso por estágio e por slide (Server-Sent Events)
+        GET  /decks/<id>/pptx     bytes do PPTX (409 enquanto não termina)
+        GET  /health              fila, jobs em execução e estatísticas dos caches
+
+    No máximo `max_concurrent` decks rodam ao mesmo tempo (em threads, o
+    pipeline é síncrono) e até `max_queue` esperam na fila.
+    """
+
+    def __init__(self, groq_key: Optional[str], hf_token: Optional[str] = None, host: str = "127.0.0.1",
+                 port: int = 8080, max_concurrent: int = 2, max_queue: int = 16, max_image_workers: int = 4,
+                 image_cache_dir: str = "output/cache/images", llm_cache_path: str = "output/cache/llm.sqlite",
+                 replay: bool = False, rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 work_dir: str = "output/server", keep_jobs: int = 100):
+        self.groq_key = groq_key
+        self.hf_token = hf_token
+        self.host = host
+        self.port = port
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(1, max_queue)
+        self.max_image_workers = max_image_workers
+        self.image_cache_dir = image_cache_dir
+        self.llm_cache_path = llm_cache_path
+        self.replay = replay
+        self.rpm = rpm
+        self.tpm = tpm
+        self.work_dir = Path(work_dir)
+        self.keep_jobs = keep_jobs
+        self.jobs: "OrderedDict[str, DeckJob]" = OrderedDict()
+        self.running = 0
+        self.manager = None
+        self.img_gen = None
+
+    def warm_up(self):
+        """Paga o cold start uma vez: imports pesados, clientes, caches, template e fontes."""
+        start = time.perf_counter()
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.manager = build_manager(self.groq_key, self.llm_cache_path, self.replay, rpm=self.rpm, tpm=self.tpm)
+        self.img_gen = build_image_service(self.hf_token, self.image_cache_dir)
+        from src.engine import renderer
+        from src.engine.layout import get_measurer
+        renderer.PptxBuilder().save(io.BytesIO())
+        get_measurer()
+        print(f"🔥 Serviços aquecidos em {time.perf_counter() - start:.2f}s.")
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        self.pool = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="deckjob")
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrent)]
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(f"🛰️ SlideGen em http://{self.host}:{self.port} "
+              f"({self.max_concurrent} decks simultâneos, fila de {self.max_queue}).")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for w in workers:
+                w.cancel()
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- Execução dos jobs ---
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run_job(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run_job(self, job: DeckJob):
+        job.status = "running"
+        self.running += 1
+        job.publish({"event": "job", "status": "running"})
+        output = self.work_dir / f"{job.id}.pptx"
+        req = job.request
+
+        def on_event(event: dict):
+            # Chamado da thread do pipeline: a publicação acontece no event loop
+            self.loop.call_soon_threadsafe(job.publish, event)
+
+        def _run() -> Optional[bytes]:
+            # Leitura e remoção do arquivo também ficam na thread do job, fora do event loop
+            try:
+                path = run_pipeline(req.prompt, req.context, str(output), self.groq_key, self.hf_token,
+                                    max_image_workers=self.max_image_workers, manager=self.manager,
+                                    img_gen=self.img_gen, streaming=req.streaming, fanout=req.fanout,
+                                    qa=req.qa, on_event=on_event)
+                return output.read_bytes() if path else None
+            finally:
+                with suppress(OSError):
+                    output.unlink()
+
+        try:
+            job.pptx = await self.loop.run_in_executor(self.pool, _run)
+            if job.pptx is not None:
+                job.finish("done")
+            else:
+                job.finish("failed", "pipeline retornou None")
+        except Exception as e:
+            traceback.print_exc()
+            job.finish("failed", repr(e))
+        finally:
+            self.running -= 1
+            self._forget_old_jobs()
+
+    def _forget_old_jobs(self):
+        finished = [j for j in self.jobs.values() if j.finished]
+        for job in finished[:max(0, len(finished) - self.keep_jobs)]:
+            del self.jobs[job.id]
+
+    # --- HTTP ---
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            try:
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                length = int(headers.get("content-length") or 0)
+                if length < 0:
+                    raise ValueError(f"Content-Length negativo: {length}")
+            except ValueError as e:
+                await self._send_json(writer, 400, {"error": f"requisição malformada: {e}"})
+                return
+            if length > MAX_BODY_BYTES:
+                await self._send_json(writer, 413, {"error": f"corpo acima de {MAX_BODY_BYTES} bytes"})
+                return
+            body = await reader.readexactly(length) if length else b""
+            await self._route(method.upper(), target.split("?", 1)[0].rstrip("/") or "/", body, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            traceback.print_exc()
+            with suppress(Exception):
+                await self._send_json(writer, 500, {"error": repr(e)})
+        finally:
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+
+    async def _route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        parts = path.strip("/").split("/")
+        if path == "/health" and method == "GET":
+            await self._send_json(writer, 200, self._health())
+        elif path == "/decks" and method == "POST":
+            await self._submit(body, writer)
+        elif len(parts) >= 2 and parts[0] == "decks":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                await self._send_json(writer, 404, {"error": "job não encontrado"})
+            elif method != "GET":
+                await self._send_json(writer, 405, {"error": "use GET"})
+            elif len(parts) == 2:
+                await self._send_json(writer, 200, job.summary())
+            elif parts[2] == "events":
+                await self._stream_events(job, writer)
+            elif parts[2] == "pptx":
+                await self._send_pptx(job, writer)
+            else:
+                await self._send_json(writer, 404, {"error": "rota desconhecida"})
+        else:
+            await self._send_json(writer, 404, {"error": "rota desconhecida"})
+
+    async def _submit(self, body: bytes, writer: asyncio.StreamWriter):
+        try:
+            request = DeckRequest.model_validate(json.loads(body or b"{}"))
+        except (ValueError, ValidationError) as e:
+            # JSON inválido, bytes fora de UTF-8 ou corpo fora do schema: erro do cliente
+            await self._send_json(writer, 400, {"error": str(e)})
+            return
+        if self.queue.full():
+            await self._send_json(writer, 429, {"error": "fila cheia", "queued": self.queue.qsize()},
+                                  headers={"Retry-After": "10"})
+            return
+        job = DeckJob(uuid.uuid4().hex[:12], request)
+        self.jobs[job.id] = job
+        job.publish({"event": "job", "status": "queued", "position": self.queue.qsize() + 1})
+        self.queue.put_nowait(job)
+        await self._send_json(writer, 202, {"job_id": job.id, "events": f"/decks/{job.id}/events",
+                                            "pptx": f"/decks/{job.id}/pptx"})
+
+    async def _stream_events(self, job: DeckJob, writer: asyncio.StreamWriter):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        q = job.subscribe()
+        try:
+            while True:
+                event = await q.get()
+                if event is None:
+                    break
+                data = json.dumps(event, ensure_ascii=False)
+                writer.write(f"event: {event['event']}\ndata: {data}\n\n".encode("utf-8"))
+                await writer.drain()
+        finally:
+            job.unsubscribe(q)
+
+    async def _send_pptx(self, job: DeckJob, writer: asyncio.StreamWriter):
+        if job.status == "failed":
+            await self._send_json(writer, 500, job.summary())
+        elif job.pptx is None:
+            await self._send_json(writer, 409, job.summary())
+        else:
+            await self._send(writer, 200, job.pptx, PPTX_MIME,
+                             {"Content-Disposition": f'attachment; filename="deck_{job.id}.pptx"'})
+
+    def _health(self) -> dict:
+        health = {"status": "ok", "running": self.running, "queued": self.queue.qsize(),
+                  "max_concurrent": self.max_concurrent, "max_queue": self.max_queue, "jobs": len(self.jobs)}
+        if self.manager and self.manager.llm_cache:
+            health["llm_cache"] = self.manager.llm_cache.stats()
+        if self.img_gen and self.img_gen.cache:
+            health["image_cache"] = self.img_gen.cache.stats()
+        return health
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: dict,
+                         headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        await self._send(writer, status, body, "application/json; charset=utf-8", headers)
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str,
+                    headers: Optional[Dict[str, str]] = None):
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                 f"Content-Length: {len(body)}", "Connection: close"]
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+def serve(groq_key: Optional[str], hf_token: Optional[str] = None, **config):
+    """Aquece os serviços e atende até Ctrl+C."""
+    server = DeckServer(groq_key, hf_token, **config)
+    server.warm_up()
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("👋 Servidor encerrado.")
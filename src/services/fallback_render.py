@@ -0,0 +1,154 @@
+import io
+import os
+import threading
+import textwrap
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+from pydantic import BaseModel
+from src.engine.layout import FONT_CANDIDATES
+
+Color = Tuple[int, int, int]
+
+class FallbackTheme(BaseModel):
+    background: Color
+    background_end: Optional[Color] = None  # gradiente vertical até esta cor
+    accent: Color
+    text: Color
+
+THEMES: Dict[str, FallbackTheme] = {
+    "default": FallbackTheme(background=(50, 50, 80), accent=(255, 200, 0), text=(255, 255, 255)),
+    "dark": FallbackTheme(background=(16, 18, 26), background_end=(38, 42, 60), accent=(0, 200, 255), text=(235, 235, 240)),
+    "light": FallbackTheme(background=(246, 245, 240), background_end=(222, 226, 234), accent=(200, 60, 40), text=(30, 30, 40)),
+}
+
+# Medidas de referência para 720 px de altura (escalam com a imagem)
+ID_FONT_PX = 32
+TEXT_FONT_PX = 24
+WRAP_CHARS = 60
+# Fundo liso + texto: compressão mínima já fica pequena e é várias vezes mais rápida
+PNG_COMPRESS_LEVEL = 1
+
+# Estado por processo: cada worker carrega fontes e fundos uma única vez
+_fonts: Dict[int, object] = {}
+_templates: Dict[Tuple[str, Tuple[int, int]], object] = {}
+_state_lock = threading.Lock()
+_wrapper = textwrap.TextWrapper(width=WRAP_CHARS)
+
+def _font(px: int):
+    with _state_lock:
+        font = _fonts.get(px)
+        if font is None:
+            from PIL import ImageFont
+            for name in FONT_CANDIDATES:
+                try:
+                    font = ImageFont.truetype(name, px)
+                    break
+                except OSError:
+                    continue
+            if font is None:
+                try:
+                    font = ImageFont.load_default(px)
+                except TypeError:
+                    # Pillow < 10.1: só a fonte bitmap
+                    font = ImageFont.load_default()
+            _fonts[px] = font
+        return font
+
+def _template(theme_id: str, size: Tuple[int, int]):
+    """Fundo do tema (cor ou gradiente + faixa de destaque), montado uma vez por tamanho."""
+    key = (theme_id, size)
+    with _state_lock:
+        template = _templates.get(key)
+        if template is None:
+            from PIL import Image, ImageDraw, ImageOps
+            theme = THEMES.get(theme_id, THEMES["default"])
+            if theme.background_end:
+                template = ImageOps.colorize(Image.linear_gradient("L").resize(size), theme.background,
+                                             theme.background_end)
+            else:
+                template = Image.new("RGB", size, theme.background)
+            ImageDraw.Draw(template).rectangle((0, 0, max(4, size[0] // 100), size[1]), fill=theme.accent)
+            _templates[key] = template
+        return template
+
+def _warm_worker(size: Tuple[int, int]):
+    scale = size[1] / 720
+    _font(round(ID_FONT_PX * scale))
+    _font(round(TEXT_FONT_PX * scale))
+    _template("default", size)
+
+def render_fallback_png(prompt: str, slide_id: str, size: Tuple[int, int], theme_id: str = "default") -> bytes:
+    """Desenha o placeholder do slide e devolve o PNG em memória (roda em qualquer processo)."""
+    from PIL import ImageDraw
+    theme = THEMES.get(theme_id, THEMES["default"])
+    scale = size[1] / 720
+    img = _template(theme_id, size).copy()
+    d = ImageDraw.Draw(img)
+    x = round(50 * scale)
+    d.text((x, round(300 * scale)), f"ID: {slide_id}", fill=theme.accent, font=_font(round(ID_FONT_PX * scale)))
+    d.multiline_text((x, round(400 * scale)), _wrapper.fill(prompt), fill=theme.text,
+                     font=_font(round(TEXT_FONT_PX * scale)))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+    return buf.getvalue()
+
+class FallbackRenderer:
+    """
+    Gerador local de imagens placeholder (sem HF), em um pool de processos.
+
+    Desenho e codificação PNG ocupam CPU de verdade, então rodam fora do GIL:
+    cada worker carrega as fontes e os fundos de cada tema uma vez e devolve
+    os bytes do PNG. Se o pool não puder ser criado (ou quebrar), o desenho
+    acontece no próprio processo.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, warm_size: Tuple[int, int] = (1280, 720)):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.warm_size = warm_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._disabled = self.max_workers <= 1
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._pool is None and not self._disabled:
+                try:
+                    # spawn: o processo pai tem threads (fork com threads pode travar)
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_warm_worker, initargs=(self.warm_size,))
+                except (OSError, ValueError, NotImplementedError) as e:
+                    print(f"   ⚠️ Pool de processos do fallback indisponível ({e}); desenhando em linha.")
+                    self._disabled = True
+            return self._pool
+
+    def render(self, prompt: str, slide_id: str, size: Tuple[int, int], theme_id: str = "default") -> bytes:
+        pool = self._get_pool()
+        if pool is not None:
+            try:
+                return pool.submit(render_fallback_png, prompt, slide_id, size, theme_id).result()
+            except BrokenProcessPool as e:
+                print(f"   ⚠️ Pool do fallback quebrou ({e}); desenhando em linha.")
+                with self._lock:
+                    self._disabled = True
+                    self._pool = None
+        return render_fallback_png(prompt, slide_id, size, theme_id)
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+_renderer: Optional[FallbackRenderer] = None
+_renderer_lock = threading.Lock()
+
+def get_fallback_renderer() -> FallbackRenderer:
+    """Renderer compartilhado pelo processo (o pool sobe no primeiro fallback)."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = FallbackRenderer()
+        return _renderer
@@ -0,0 +1,191 @@
+import os
+import json
+import atexit
+import time
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+from src.core.telemetry import get_tracer
+
+class ImageCache:
+    """
+    Cache persistente de imagens endereçado por conteúdo.
+
+    A chave é o hash de (prompt, modelo, aspect_ratio, tamanho). Os arquivos
+    ficam em `cache_dir/<hash>.png` e um `index.json` guarda tamanho e último
+    acesso de cada entrada para a remoção LRU quando o limite é ultrapassado.
+
+    O índice vive em memória em ordem de acesso (mais antigo primeiro) e é
+    regravado em lotes: a cada `flush_every` alterações, a cada
+    `flush_seconds` ou em `flush()`/`close()` (também chamado na saída do
+    processo). Um hit não reescreve o arquivo.
+    """
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: str = "output/cache/images", max_bytes: int = 512 * 1024 * 1024,
+                 max_entries: Optional[int] = None, flush_every: int = 64, flush_seconds: float = 5.0):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+        self._bytes = sum(e["size"] for e in self._index.values())
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def make_key(prompt: str, model: str, aspect_ratio: str, size: Tuple[int, int], salt: str = "") -> str:
+        payload = json.dumps([prompt, model, aspect_ratio, list(size), salt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.png"
+
+    def _load_index(self) -> "OrderedDict[str, dict]":
+        index_path = self.cache_dir / self.INDEX_FILE
+        if not index_path.exists():
+            return OrderedDict()
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"   ⚠️ Índice do cache de imagens corrompido ({e}). Recriando.")
+            return OrderedDict()
+        # Descarta entradas cujo arquivo sumiu; a ordem do LRU é montada uma vez aqui
+        entries = [(k, v) for k, v in data.get("entries", {}).items() if self.path_for(k).exists()]
+        entries.sort(key=lambda kv: kv[1].get("last_access", 0))
+        return OrderedDict(entries)
+
+    def _save_index(self):
+        index_path = self.cache_dir / self.INDEX_FILE
+        tmp_path = index_path.with_suffix(f".json.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "entries": self._index}, f)
+        os.replace(tmp_path, index_path)
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+
+    def _touch(self):
+        """Conta uma alteração do índice e grava se o lote encheu ou o intervalo passou."""
+        self._dirty += 1
+        if self._dirty >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self._save_index()
+
+    def flush(self):
+        """Grava o índice se houver alterações pendentes."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+
+    def get(self, key: str) -> Optional[str]:
+        """Retorna o caminho do artefato em cache ou None (contabiliza hit/miss)."""
+        with self._lock:
+            entry = self._index.get(key)
+            path = self.path_for(key)
+            if entry is None or not path.exists():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                get_tracer().incr("image_cache_misses")
+                return None
+            entry["last_access"] = time.time()
+            self._index.move_to_end(key)
+            self.hits += 1
+            get_tracer().incr("image_cache_hits")
+            self._touch()
+            return str(path)
+
+    def put(self, key: str, source_path: str, meta: Optional[dict] = None) -> str:
+        """Move o arquivo gerado para o cache e aplica a política de remoção."""
+        path = self.path_for(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        shutil.move(source_path, tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._bytes -= old["size"]
+            self._index[key] = {
+                "size": path.stat().st_size,
+                "last_access": time.time(),
+                "meta": meta or {},
+            }
+            self._bytes += self._index[key]["size"]
+            self._evict()
+            self._touch()
+        return str(path)
+
+    def _remove(self, key: str):
+        entry = self._index.pop(key)
+        self._bytes -= entry["size"]
+        self._dirty += 1
+
+    def _over_limit(self) -> bool:
+        return self._bytes > self.max_bytes or bool(self.max_entries and len(self._index) > self.max_entries)
+
+    def _evict(self):
+        # O índice já está em ordem de acesso: remove do começo só enquanto passar do limite
+        while self._over_limit() and len(self._index) > 1:
+            # Nunca remove o que acabou de entrar (fim da fila)
+            key = next(iter(self._index))
+            self.path_for(key).unlink(missing_ok=True)
+            self._remove(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._index),
+                "bytes": self._bytes,
+            }
+
+class MemoryImages:
+    """
+    Bytes das imagens geradas neste processo, por caminho do arquivo.
+
+    O arquivo continua sendo gravado (cache persistente, manifesto), mas o
+    validador e o renderer leem daqui em vez de reabrir o disco. LRU por bytes.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, path: str, data: bytes):
+        with self._lock:
+            old = self._items.pop(path, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[path] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def get(self, path: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(path)
+            if data is not None:
+                self._items.move_to_end(path)
+            return data
+
+_memory_images = MemoryImages()
+
+def memory_images() -> MemoryImages:
+    return _memory_images
@@ -1,50 +1,183 @@
+import io
 import time
-import textwrap
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 from pathlib import Path
-from typing import Optional
-from PIL import Image, ImageDraw, ImageFont
+from typing import Iterator, List, Optional, Tuple
+from src.services.image_cache import ImageCache, memory_images
+from src.services.fallback_render import FallbackRenderer, get_fallback_renderer
+from src.services.service_client import CircuitOpenError, get_service
+from src.core.telemetry import get_tracer
 
-try:
-    from huggingface_hub import InferenceClient
-except ImportError:
-    InferenceClient = None
+def _load_inference_client():
+    """Importa o cliente HF sob demanda (o pacote é pesado e opcional)."""
+    try:
+        from huggingface_hub import InferenceClient
+    except ImportError:
+        return None
+    return InferenceClient
+
+def _share_hf_session(service):
+    """Faz o huggingface_hub usar a sessão com pool do cliente compartilhado (versões com backend requests)."""
+    try:
+        from huggingface_hub import configure_http_backend
+    except ImportError:
+        return
+    configure_http_backend(backend_factory=lambda: service.session)
+
+HF_MODEL = "black-forest-labs/FLUX.1-schnell"
+FALLBACK_MODEL = "local/pillow-fallback"
+
+# Resolução pedida ao modelo para cada proporção (múltiplos de 16 para o FLUX)
+SIZE_BY_ASPECT = {
+    "16:9": (1280, 720),
+    "4:3": (1024, 768),
+    "1:1": (1024, 1024),
+}
 
 class ImageGeneratorService:
-    def __init__(self, hf_token: Optional[str] = None, output_dir: str = "output/assets"):
+    def __init__(self, hf_token: Optional[str] = None, output_dir: str = "output/assets", timeout: Optional[float] = 60.0,
+                 cache: Optional[ImageCache] = None, hf_client=None, fallback: Optional[FallbackRenderer] = None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.hf_client = None
-        
-        if hf_token and InferenceClient:
+        self.timeout = timeout
+        self.cache = cache
+        # Placeholders locais: pool de processos com fontes e fundos por tema já carregados
+        self.fallback = fallback or get_fallback_renderer()
+        # Retries, cota e circuit breaker do HF são do processo, não desta instância:
+        # com o circuito aberto as imagens vão para o fallback e o HF volta sozinho
+        self.hf = get_service("huggingface", timeout=timeout or 60.0)
+
+        InferenceClient = _load_inference_client() if hf_token and hf_client is None else None
+        if hf_client is not None:
+            # Cliente injetado (ex.: dublê local nos benchmarks)
+            self.hf_client = hf_client
+            print("   🎨 Serviço de IA Generativa (cliente injetado) ATIVO.")
+        elif hf_token and InferenceClient:
             try:
-                self.hf_client = InferenceClient(token=hf_token)
+                _share_hf_session(self.hf)
+                self.hf_client = InferenceClient(token=hf_token, timeout=timeout)
                 print("   🎨 Serviço de IA Generativa (HuggingFace) ATIVO.")
             except Exception as e:
                 print(f"   ⚠️ Erro ao iniciar cliente HF: {e}. Usando Fallback.")
         else:
             print("   🎨 Modo Fallback (Imagens Sintéticas) ATIVO.")
 
-    def generate(self, prompt: str, slide_id: str) -> str:
-        filename = self.output_dir / f"{slide_id}_{int(time.time())}.png"
+    def generate(self, prompt: str, slide_id: str, aspect_ratio: str = "16:9", theme_id: str = "default",
+                 variant: str = "") -> str:
+        """
+        `variant` entra só na chave do cache: regerar com um valor novo nunca
+        devolve o arquivo guardado para a mesma chave (ex.: imagem reprovada).
+        """
+        with get_tracer().span("image.generate", slide=slide_id) as span:
+            path, span["backend"] = self._generate(prompt, slide_id, aspect_ratio, theme_id, variant)
+        get_tracer().incr("images", backend=span.get("backend"))
+        return path
+
+    def _generate(self, prompt: str, slide_id: str, aspect_ratio: str, theme_id: str = "default",
+                  variant: str = "") -> Tuple[str, str]:
+        """Retorna (caminho, backend), onde backend é 'hf', 'fallback' ou 'cache'."""
         safe_prompt = prompt if prompt else f"Slide {slide_id}"
-        
-        # 1. Tenta HuggingFace
-        if self.hf_client:
+        size = SIZE_BY_ASPECT.get(aspect_ratio, SIZE_BY_ASPECT["16:9"])
+
+        # 1. Tenta HuggingFace (retries e circuit breaker ficam no cliente compartilhado)
+        client = self.hf_client
+        if client:
+            key = ImageCache.make_key(safe_prompt, HF_MODEL, aspect_ratio, size, salt=variant)
+            cached = self._from_cache(key)
+            if cached:
+                return cached, "cache"
             try:
                 print(f"   🖌️ Gerando via Flux.1: '{safe_prompt[:40]}...'")
-                image = self.hf_client.text_to_image(safe_prompt, model="black-forest-labs/FLUX.1-schnell")
-                image.save(filename)
-                return str(filename)
+                image = self.hf.call(client.text_to_image, safe_prompt, model=HF_MODEL, width=size[0], height=size[1])
+                return self._store(image, slide_id, key, safe_prompt, HF_MODEL), "hf"
+            except CircuitOpenError:
+                get_tracer().incr("hf_circuit_open")
             except Exception as e:
-                print(f"   ⚠️ Erro na API HF: {e}. Mudando para fallback local.")
-                self.hf_client = None 
-
-        # 2. Fallback Local (Pillow)
-        img = Image.new('RGB', (1280, 720), color=(50, 50, 80))
-        d = ImageDraw.Draw(img)
-        d.text((50, 300), f"ID: {slide_id}", fill=(255, 200, 0))
-        wrapped = textwrap.fill(safe_prompt, width=60)
-        d.text((50, 400), wrapped, fill=(255, 255, 255))
-        
-        img.save(filename)
-        return str(filename)
\ No newline at end of file
+                get_tracer().incr("hf_errors")
+                print(f"   ⚠️ Erro na API HF: {e}. Usando fallback local para o slide {slide_id}.")
+
+        # 2. Fallback Local (Pillow) — o desenho inclui o ID e o tema, então eles entram na chave
+        salt = slide_id if theme_id == "default" else f"{slide_id}:{theme_id}"
+        if variant:
+            salt = f"{salt}:{variant}"
+        key = ImageCache.make_key(safe_prompt, FALLBACK_MODEL, aspect_ratio, size, salt=salt)
+        cached = self._from_cache(key)
+        if cached:
+            return cached, "cache"
+
+        data = self.fallback.render(safe_prompt, slide_id, size, theme_id)
+        return self._store_bytes(data, slide_id, key, safe_prompt, FALLBACK_MODEL), "fallback"
+
+    def _from_cache(self, key: str) -> Optional[str]:
+        if not self.cache:
+            return None
+        path = self.cache.get(key)
+        if path:
+            print(f"   ♻️ Imagem reaproveitada do cache ({key[:10]}).")
+        return path
+
+    def _store(self, image, slide_id: str, key: str, prompt: str, model: str) -> str:
+        buf = io.BytesIO()
+        image.save(buf, format="PNG")
+        return self._store_bytes(buf.getvalue(), slide_id, key, prompt, model)
+
+    def _store_bytes(self, data: bytes, slide_id: str, key: str, prompt: str, model: str) -> str:
+        """Grava o PNG (cache ou assets) e deixa os bytes em memória para o validador e o renderer."""
+        if not self.cache:
+            # Decks paralelos (batch, servidor) repetem ids de slide no mesmo segundo
+            filename = self.output_dir / f"{slide_id}_{int(time.time())}_{uuid.uuid4().hex[:8]}.png"
+            filename.write_bytes(data)
+            path = str(filename)
+        else:
+            # Salva em arquivo temporário único e move para o cache endereçado por conteúdo
+            tmp_name = self.output_dir / f".{key}.{threading.get_ident()}.png"
+            tmp_name.write_bytes(data)
+            path = self.cache.put(key, str(tmp_name), meta={"model": model, "prompt": prompt[:200]})
+        memory_images().put(path, data)
+        return path
+
+    def concurrency(self, requested: int) -> int:
+        """Sem HF tudo cai no fallback local, limitado por CPU e não pela cota: um worker por núcleo."""
+        return requested if self.hf_client else max(requested, self.fallback.max_workers)
+
+    def generate_many(self, jobs: List[Tuple[str, ...]], max_workers: int = 4,
+                      timeout: Optional[float] = None) -> Iterator[Tuple[str, Optional[str], Optional[Exception]]]:
+        """
+        Gera várias imagens em paralelo com um pool de threads limitado.
+
+        Args:
+            jobs: Tuplas (slide_id, prompt[, aspect_ratio[, theme_id[, variant]]]).
+            max_workers: Número máximo de chamadas simultâneas ao HF (sem HF,
+                vale o número de núcleos do fallback local).
+            timeout: Tempo máximo (s) para o lote inteiro; por padrão usa o
+                timeout por requisição vezes o número de rodadas do pool.
+
+        Yields:
+            (slide_id, caminho, erro) na ordem em que as imagens ficam prontas.
+        """
+        if not jobs:
+            return
+        workers = max(1, min(self.concurrency(max_workers), len(jobs)))
+        if timeout is None and self.timeout:
+            rounds = -(-len(jobs) // workers)
+            timeout = self.timeout * rounds + 30
+
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="imggen")
+        futures = {pool.submit(self.generate, job[1], job[0], *job[2:]): job[0] for job in jobs}
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                slide_id = futures[future]
+                try:
+                    yield slide_id, future.result(), None
+                except Exception as e:
+                    yield slide_id, None, e
+        except FuturesTimeout as e:
+            for future, slide_id in futures.items():
+                if not future.done():
+                    future.cancel()
+                    yield slide_id, None, e
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,190 @@
+import io
+import os
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from src.engine.layout import LayoutDeck
+from src.services.image_cache import memory_images
+
+# Acima disso a imagem é tratada como "foto" e vai para JPEG
+MAX_PALETTE_COLORS = 256
+JPEG_QUALITY = 85
+# Até esse número de imagens o encode roda em linha: subir workers custa mais que o ganho
+INLINE_MAX_IMAGES = 4
+
+class ImageOptimizationReport(BaseModel):
+    images: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    formats: Dict[str, int] = {}
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+def fit_size(size: Tuple[int, int], max_px: Tuple[int, int]) -> Tuple[int, int]:
+    """Reduz cada eixo ao limite da caixa (nunca amplia)."""
+    return min(size[0], max_px[0]), min(size[1], max_px[1])
+
+def box_pixels(w_in: float, h_in: float, dpi: int) -> Tuple[int, int]:
+    return max(1, int(w_in * dpi)), max(1, int(h_in * dpi))
+
+def optimize_image(src: str, output_dir: str, max_px: Tuple[int, int], quality: int = JPEG_QUALITY,
+                   data: Optional[bytes] = None) -> Tuple[str, int, int, str]:
+    """
+    Redimensiona para a caixa, escolhe o formato pelo conteúdo e regrava sem metadados.
+
+    - Imagens com transparência ou poucas cores (fallbacks, diagramas): PNG paletizado.
+    - Imagens fotográficas (FLUX): JPEG progressivo.
+
+    O nome do arquivo de saída deriva do conteúdo de origem e dos parâmetros,
+    então reprocessar a mesma imagem é gratuito. Quando o original vence, um
+    marcador `<hash>.orig` guarda a decisão (sem reencodar na próxima vez).
+    `data` (bytes já em memória) evita reler `src` do disco.
+
+    Returns:
+        (caminho_otimizado, bytes_antes, bytes_depois, formato)
+    """
+    return _optimize(src, output_dir, max_px, quality, data)[:4]
+
+def _optimize(src: str, output_dir: str, max_px: Tuple[int, int], quality: int = JPEG_QUALITY,
+              data: Optional[bytes] = None) -> Tuple[str, int, int, str, Optional[bytes]]:
+    """`optimize_image` devolvendo também os bytes codificados (None se nada foi codificado)."""
+    from PIL import Image
+
+    if data is None:
+        with open(src, "rb") as f:
+            data = f.read()
+    digest = hashlib.sha1(data + repr((max_px, quality)).encode()).hexdigest()[:20]
+    out_dir = Path(output_dir)
+
+    for ext, fmt in ((".jpg", "JPEG"), (".png", "PNG")):
+        existing = out_dir / f"{digest}{ext}"
+        if existing.exists():
+            return str(existing), len(data), existing.stat().st_size, fmt, None
+    keep_original = out_dir / f"{digest}.orig"
+    if keep_original.exists():
+        return src, len(data), len(data), "original", None
+
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        img = img.convert("RGBA" if has_alpha else "RGB")
+        original_size = img.size
+        target = fit_size(img.size, max_px)
+        if target != img.size:
+            img = img.resize(target, Image.LANCZOS)
+
+        # getcolors devolve None quando há mais cores que o limite
+        flat = img.getcolors(MAX_PALETTE_COLORS) is not None
+        if has_alpha or flat:
+            fmt, dst = "PNG", out_dir / f"{digest}.png"
+            out = img if has_alpha else img.quantize(colors=MAX_PALETTE_COLORS)
+            save_kwargs = {"optimize": True}
+        else:
+            fmt, dst = "JPEG", out_dir / f"{digest}.jpg"
+            out = img
+            save_kwargs = {"quality": quality, "optimize": True, "progressive": True}
+        buf = io.BytesIO()
+        out.save(buf, format=fmt, **save_kwargs)
+        encoded = buf.getvalue()
+
+    # Sem redimensionar e sem ganho de tamanho: o original já é a melhor opção
+    if target == original_size and len(encoded) >= len(data):
+        keep_original.touch()
+        return src, len(data), len(data), "original", None
+    # Grava em arquivo temporário: outro worker (processo ou thread) pode estar escrevendo o mesmo hash
+    tmp = dst.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(encoded)
+    os.replace(tmp, dst)
+    return str(dst), len(data), len(encoded), fmt, encoded
+
+def optimize_layout_images(layout: LayoutDeck, output_dir: str = "output/optimized", dpi: int = 150,
+                           workers: Optional[int] = None, quality: int = JPEG_QUALITY) -> ImageOptimizationReport:
+    """
+    Otimiza todas as imagens do layout e aponta cada caixa para o arquivo
+    otimizado. O encode é CPU-bound: lotes maiores que `INLINE_MAX_IMAGES`
+    vão para o pool de processos do módulo (criado uma vez, no primeiro
+    lote grande); os pequenos (ex.: um slide do streaming) rodam em linha,
+    assim como tudo com `workers=1`.
+
+    As caixas recebem uma cópia do ImageRef, para não alterar o DeckIR de origem.
+    Origem e resultado passam pelo MemoryImages: o arquivo só é gravado.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    boxes = [b for s in layout.slides for b in s.boxes
+             if b.kind == "image" and b.image_ref and b.image_ref.local_path]
+    report = ImageOptimizationReport()
+    if not boxes:
+        return report
+
+    # Um job por (arquivo, tamanho de caixa): imagens repetidas são processadas uma vez
+    jobs: Dict[Tuple[str, Tuple[int, int]], List] = {}
+    for b in boxes:
+        jobs.setdefault((b.image_ref.local_path, box_pixels(b.w, b.h, dpi)), []).append(b)
+
+    keys = list(jobs)
+    # Imagens geradas neste processo vão em memória para o worker (sem reler o disco)
+    images = memory_images()
+    args = [(path, output_dir, px, quality, images.get(path)) for path, px in keys]
+    pool = None if len(args) <= INLINE_MAX_IMAGES or workers == 1 else _get_pool()
+    results = None
+    if pool is not None:
+        try:
+            results = list(pool.map(_safe_optimize, args))
+        except BrokenProcessPool as e:
+            print(f"   ⚠️ Pool do otimizador quebrou ({e}); otimizando em linha.")
+            _disable_pool()
+    if results is None:
+        results = [_safe_optimize(a) for a in args]
+
+    for key, result in zip(keys, results):
+        if result is None:
+            continue
+        dst, before, after, fmt, encoded = result
+        if encoded is not None:
+            # O renderer lê daqui em vez de reabrir o arquivo otimizado
+            images.put(dst, encoded)
+        report.images += 1
+        report.bytes_before += before
+        report.bytes_after += after
+        report.formats[fmt] = report.formats.get(fmt, 0) + 1
+        for b in jobs[key]:
+            b.image_ref = b.image_ref.model_copy(update={"local_path": dst})
+    return report
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_disabled = (os.cpu_count() or 1) <= 1
+_pool_lock = threading.Lock()
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool compartilhado pelo processo; None se não puder ser criado (otimiza em linha)."""
+    global _pool, _pool_disabled
+    with _pool_lock:
+        if _pool is None and not _pool_disabled:
+            try:
+                # spawn: quem chama pode ter threads (batch, servidor, variantes) e fork com threads pode travar
+                _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                            mp_context=multiprocessing.get_context("spawn"))
+            except (OSError, ValueError, NotImplementedError) as e:
+                print(f"   ⚠️ Pool de processos do otimizador indisponível ({e}); otimizando em linha.")
+                _pool_disabled = True
+        return _pool
+
+def _disable_pool():
+    global _pool, _pool_disabled
+    with _pool_lock:
+        _pool_disabled = True
+        _pool = None
+
+def _safe_optimize(args) -> Optional[Tuple[str, int, int, str, Optional[bytes]]]:
+    try:
+        return _optimize(*args)
+    except Exception as e:
+        print(f"   ⚠️ Falha ao otimizar {args[0]}: {e}. Mantendo o original.")
+        return None
@@ -1,44 +1,207 @@
-import os
+import io
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from src.core.telemetry import get_tracer
+from src.services.image_cache import memory_images
+
+MIN_BYTES = 1024
+MIN_SIDE_PX = 64
+ALLOWED_FORMATS = {"PNG", "JPEG", "WEBP"}
+# Miniatura em tons de cinza usada nas checagens e no hash perceptual
+THUMB_PX = 32
+PHASH_BITS = 8
+# Desvio padrão (0-255) da miniatura abaixo do qual a imagem é uma cor só
+BLANK_STD = 1.0
+# Abaixo disso o pHash é só ruído (ex.: fallback liso com texto): fica fora da deduplicação
+MIN_DETAIL_STD = 8.0
+# Escuridão extrema: média e percentil 95 muito baixos
+DARK_MEAN = 18.0
+DARK_P95 = 40.0
+# Distância de Hamming (em 64 bits) até a qual duas imagens são a mesma
+DUPLICATE_DISTANCE = 6
+
+class ImageCheck(BaseModel):
+    """Resultado da validação de um arquivo (e, no lote, do slide que o usa)."""
+    path: str
+    ok: bool
+    issues: List[str] = []  # missing, too_small, unreadable, bad_format, low_res, blank, too_dark, duplicate
+    file_hash: Optional[str] = None
+    width: int = 0
+    height: int = 0
+    format: Optional[str] = None
+    mean: float = 0.0
+    std: float = 0.0
+    phash: Optional[int] = None
+    duplicate_of: Optional[str] = None
+
+def _dct_matrix(n: int):
+    import numpy as np
+    k = np.arange(n)[:, None]
+    m = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n))
+    m[0] /= np.sqrt(2)
+    return m * np.sqrt(2 / n)
+
+_DCT = None
+
+def perceptual_hash(gray) -> int:
+    """pHash: DCT 2D da miniatura, 8x8 frequências baixas (sem o DC) contra a mediana."""
+    import numpy as np
+    global _DCT
+    if _DCT is None:
+        _DCT = _dct_matrix(THUMB_PX)
+    low = (_DCT @ gray @ _DCT.T)[:PHASH_BITS, :PHASH_BITS].ravel()
+    bits = low > np.median(low[1:])
+    bits[0] = False
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
 
 class ImageValidatorService:
-    def __init__(self):
+    """
+    Validação barata das imagens geradas, antes do render.
+
+    Por arquivo: tamanho mínimo, cabeçalho (formato e resolução, sem decodificar
+    os pixels), depois uma miniatura 32x32 em cinza para as checagens NumPy
+    (imagem lisa/em branco, escuridão extrema) e o hash perceptual. O
+    resultado fica em cache pelo hash do conteúdo: a mesma imagem nunca é
+    reanalisada no processo, mesmo vinda de outro caminho ou outro deck.
+
+    No lote (`validate_many`), imagens quase idênticas entre slides (distância
+    de Hamming pequena entre os pHashes) são marcadas como duplicadas; a
+    primeira ocorrência fica.
+    """
+
+    def __init__(self, min_bytes: int = MIN_BYTES, min_side: int = MIN_SIDE_PX,
+                 duplicate_distance: int = DUPLICATE_DISTANCE):
         # Aqui você poderia inicializar um cliente Groq para visão no futuro
         # self.vision_client = ...
-        pass
+        self.min_bytes = min_bytes
+        self.min_side = min_side
+        self.duplicate_distance = duplicate_distance
+        self._results: Dict[str, ImageCheck] = {}
+        self._lock = threading.Lock()
+
+    def check(self, image_path: str) -> ImageCheck:
+        """Checagens de um arquivo isolado (sem deduplicação)."""
+        if not image_path:
+            return ImageCheck(path="", ok=False, issues=["missing"])
+        data = memory_images().get(image_path)
+        try:
+            if data is None:
+                data = Path(image_path).read_bytes()
+        except OSError:
+            return ImageCheck(path=image_path, ok=False, issues=["missing"])
+        # Evita arquivos corrompidos/vazios
+        if len(data) < self.min_bytes:
+            return ImageCheck(path=image_path, ok=False, issues=["too_small"])
+
+        file_hash = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            cached = self._results.get(file_hash)
+        if cached:
+            get_tracer().incr("image_validation_cache", result="hit")
+            return cached.model_copy(update={"path": image_path})
+        get_tracer().incr("image_validation_cache", result="miss")
+
+        result = self._analyze(data, image_path, file_hash)
+        with self._lock:
+            self._results[file_hash] = result
+        return result
+
+    def _analyze(self, data: bytes, image_path: str, file_hash: str) -> ImageCheck:
+        import numpy as np
+        from PIL import Image
+
+        try:
+            img = Image.open(io.BytesIO(data))
+            # Só o cabeçalho foi lido até aqui: formato e dimensões saem de graça
+            fmt, (width, height) = img.format, img.size
+            info = {"file_hash": file_hash, "width": width, "height": height, "format": fmt}
+            if fmt not in ALLOWED_FORMATS:
+                return ImageCheck(path=image_path, ok=False, issues=["bad_format"], **info)
+            if min(width, height) < self.min_side:
+                return ImageCheck(path=image_path, ok=False, issues=["low_res"], **info)
+            # JPEG decodifica direto em escala reduzida (DCT); PNG decodifica e reduz em caixas
+            img.draft("L", (THUMB_PX * 4, THUMB_PX * 4))
+            thumb = img.convert("L").resize((THUMB_PX, THUMB_PX), Image.Resampling.BOX, reducing_gap=2.0)
+        except Exception:
+            return ImageCheck(path=image_path, ok=False, issues=["unreadable"], file_hash=file_hash)
+
+        gray = np.asarray(thumb, dtype=np.float32)
+        mean, std = float(gray.mean()), float(gray.std())
+        issues = []
+        if std < BLANK_STD:
+            issues.append("blank")
+        elif mean < DARK_MEAN and np.percentile(gray, 95) < DARK_P95:
+            issues.append("too_dark")
+        phash = perceptual_hash(gray) if not issues and std >= MIN_DETAIL_STD else None
+        return ImageCheck(path=image_path, ok=not issues, issues=issues, mean=round(mean, 2),
+                          std=round(std, 2), phash=phash, **info)
+
+    def validate_many(self, items: List[Tuple[str, str]], max_workers: int = 4) -> Dict[str, ImageCheck]:
+        """
+        Valida as imagens de vários slides em paralelo e deduplica entre eles.
+
+        Args:
+            items: Pares (slide_id, caminho), na ordem do deck.
+
+        Returns:
+            slide_id → ImageCheck (duplicatas com issue 'duplicate' e `duplicate_of`).
+        """
+        if not items:
+            return {}
+        workers = max(1, min(max_workers, len(items)))
+        with get_tracer().span("images.validate", count=len(items)):
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="imgval") as pool:
+                checks = list(pool.map(self.check, [path for _, path in items]))
+
+        results: Dict[str, ImageCheck] = {}
+        seen: List[Tuple[str, int]] = []
+        for (slide_id, _), check in zip(items, checks):
+            if check.ok and check.phash is not None:
+                original = next((sid for sid, h in seen if hamming(h, check.phash) <= self.duplicate_distance), None)
+                if original:
+                    check = check.model_copy(update={"ok": False, "issues": [*check.issues, "duplicate"],
+                                                     "duplicate_of": original})
+                else:
+                    seen.append((slide_id, check.phash))
+            results[slide_id] = check
+        return results
 
     def validate(self, image_path: str, context_prompt: str) -> bool:
         """
         Valida se a imagem gerada é aceitável.
-        
+
         Args:
             image_path: Caminho local do arquivo de imagem.
             context_prompt: O prompt que gerou a imagem (para validação semântica futura).
-            
+
         Returns:
             bool: True se a imagem passou no teste, False caso contrário.
         """
-        # 1. Validação Física (Básica)
-        if not image_path:
-            print("      ❌ Caminho da imagem vazio.")
-            return False
-            
-        path = Path(image_path)
-        
-        if not path.exists():
-            print(f"      ❌ Arquivo não encontrado: {image_path}")
-            return False
-            
-        # Verifica se o arquivo tem tamanho > 1KB (evita arquivos corrompidos/vazios)
-        if path.stat().st_size < 1024:
-            print(f"      ❌ Imagem muito pequena ou corrompida ({path.stat().st_size} bytes).")
-            return False
-
-        # 2. Validação Semântica (Futuro / Placeholder)
+        result = self.check(image_path)
+        if not result.ok:
+            print(f"      ❌ Imagem reprovada ({', '.join(result.issues)}): {image_path}")
+
+        # Validação Semântica (Futuro / Placeholder)
         # Aqui entra a lógica de "Vision AI":
         # - Enviar a imagem para o Llama 3.2 Vision
         # - Perguntar: "Esta imagem representa bem o conceito '{context_prompt}'?"
         # - Se a resposta for "Não", retornar False para forçar regeneração.
-        
-        # Por enquanto, assumimos que se o arquivo existe, está válido.
-        return True
\ No newline at end of file
+        return result.ok
+
+_validator: Optional[ImageValidatorService] = None
+_validator_lock = threading.Lock()
+
+def get_validator() -> ImageValidatorService:
+    """Validador compartilhado pelo processo (o cache por hash vale entre decks)."""
+    global _validator
+    with _validator_lock:
+        if _validator is None:
+            _validator = ImageValidatorService()
+        return _validator
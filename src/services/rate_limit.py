@@ -0,0 +1,63 @@
+import time
+import threading
+from typing import Optional
+
+class TokenBucket:
+    """
+    Balde de tokens com reabastecimento contínuo.
+
+    `reserve` debita na hora (o saldo pode ficar negativo) e devolve quanto
+    o chamador deve esperar; assim as reservas são atendidas em ordem de
+    chegada, sem busy-wait.
+    """
+
+    def __init__(self, rate_per_s: float, capacity: float):
+        self.rate = rate_per_s
+        self.capacity = capacity
+        self.level = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._last) * self.rate)
+        self._last = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        with self._lock:
+            self._refill()
+            self.level -= amount
+            return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def drain(self, seconds: float):
+        """Zera o saldo e empurra o reabastecimento (ex.: após um 429 com Retry-After)."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.level, 0.0) - seconds * self.rate
+
+class RateLimiter:
+    """Limites por minuto de requisições (RPM) e de tokens (TPM) de um provedor."""
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm / 60.0, rpm) if rpm else None
+        self.tokens = TokenBucket(tpm / 60.0, tpm) if tpm else None
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Bloqueia até a chamada caber nos dois limites; devolve o tempo esperado (s)."""
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def backoff(self, seconds: float):
+        """Pausa todo o provedor (todas as threads) por `seconds`."""
+        if self.requests:
+            self.requests.drain(seconds)
+        if self.tokens:
+            self.tokens.drain(seconds)
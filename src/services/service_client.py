@@ -0,0 +1,247 @@
+import time
+import random
+import threading
+from typing import Any, Callable, Dict, Optional
+from src.core.telemetry import get_tracer
+from src.services.rate_limit import RateLimiter
+
+# Status que indicam sobrecarga/instabilidade do provedor (vale tentar de novo)
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+class CircuitOpenError(RuntimeError):
+    """O provedor está com o circuito aberto: a chamada nem foi feita."""
+
+def status_of(error: BaseException) -> Optional[int]:
+    """Status HTTP de exceções do requests, huggingface_hub, LiteLLM ou dublês."""
+    for obj in (error, getattr(error, "response", None)):
+        code = getattr(obj, "status_code", None)
+        if isinstance(code, int):
+            return code
+    return None
+
+def is_retryable(error: BaseException) -> bool:
+    status = status_of(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # Clientes diferentes, nomes parecidos: requests.ConnectTimeout, litellm.RateLimitError...
+    name = type(error).__name__.lower()
+    return any(k in name for k in ("timeout", "connection", "ratelimit", "serviceunavailable"))
+
+def retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        # Retry-After em formato de data HTTP: ignorado, vale o backoff exponencial
+        return None
+
+class RetryPolicy:
+    """Backoff exponencial com jitter total (evita que as threads voltem juntas)."""
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 20.0,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+class RetryBudget:
+    """
+    Orçamento de novas tentativas: cada requisição deposita `ratio` e cada
+    retry saca 1. Com o provedor fora do ar, os retries param em ~`ratio`
+    do tráfego em vez de multiplicá-lo.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_balance: float = 5.0, max_balance: float = 20.0):
+        self.ratio = ratio
+        self.max_balance = max_balance
+        self.balance = min_balance
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.balance = min(self.max_balance, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.balance < 1.0:
+                return False
+            self.balance -= 1.0
+            return True
+
+class CircuitBreaker:
+    """
+    Fechado → aberto após `failure_threshold` falhas seguidas; depois de
+    `reset_timeout` segundos fica meio-aberto e deixa passar UMA chamada de
+    teste: sucesso fecha o circuito, falha reabre.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"Circuito de {self.name} aberto.")
+                self._set(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError(f"Circuito de {self.name} em teste.")
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != self.CLOSED:
+                self._set(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self.state != self.OPEN:
+                    self._set(self.OPEN)
+
+    def _set(self, state: str):
+        self.state = state
+        labels = {self.OPEN: f"ABERTO por {self.reset_timeout:g}s", self.HALF_OPEN: "meio-aberto (testando)",
+                  self.CLOSED: "fechado (recuperado)"}
+        print(f"   🔌 Circuito de {self.name}: {labels[state]}.")
+        get_tracer().incr("circuit_transitions", service=self.name, state=state)
+
+class ServiceClient:
+    """
+    Cliente compartilhado de um provedor externo.
+
+    Toda chamada passa por circuit breaker → limitador RPM/TPM → chamada →
+    retry com backoff (respeitando Retry-After e o orçamento de retries).
+    `call` envolve SDKs (LiteLLM, huggingface_hub); `request` faz HTTP direto
+    numa `requests.Session` com pool keep-alive (útil contra um servidor stub).
+    """
+
+    def __init__(self, name: str, base_url: str = "", rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 retry: Optional[RetryPolicy] = None, budget: Optional[RetryBudget] = None,
+                 breaker: Optional[CircuitBreaker] = None, pool_size: int = 16, timeout: float = 60.0):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.limiter = RateLimiter(rpm=rpm, tpm=tpm)
+        self.retry = retry or RetryPolicy()
+        self.budget = budget or RetryBudget()
+        self.breaker = breaker or CircuitBreaker(name)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def set_limits(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        """
+        Os limites valem por provedor (chave de API), então são trocados para
+        todos os usuários. `None` mantém o limite atual; 0 desliga.
+        """
+        rpm = self.limiter.rpm if rpm is None else rpm
+        tpm = self.limiter.tpm if tpm is None else tpm
+        self.limiter = RateLimiter(rpm=rpm, tpm=tpm)
+
+    @property
+    def session(self):
+        """`requests.Session` com pool de conexões, criada no primeiro uso."""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def call(self, fn: Callable[..., Any], *args, tokens: int = 0, **kwargs) -> Any:
+        tracer = get_tracer()
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            waited = self.limiter.acquire(tokens)
+            if waited:
+                tracer.incr("rate_limit_wait_seconds", waited, service=self.name)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    # O provedor respondeu (ex.: 400): não conta contra o circuito
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                tracer.incr("service_errors", service=self.name, status=str(status_of(e)))
+                if attempt + 1 >= self.retry.max_attempts:
+                    raise
+                if not self.budget.withdraw():
+                    tracer.incr("retry_budget_exhausted", service=self.name)
+                    raise
+                hint = retry_after(e)
+                if hint:
+                    # 429 com Retry-After: pausa o provedor inteiro, não só esta thread
+                    self.limiter.backoff(hint)
+                delay = max(self.retry.delay(attempt), hint or 0.0)
+                attempt += 1
+                tracer.incr("service_retries", service=self.name)
+                print(f"   🔁 {self.name}: {type(e).__name__} ({status_of(e) or 'sem status'}); "
+                      f"tentativa {attempt + 1}/{self.retry.max_attempts} em {delay:.1f}s.")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def request(self, method: str, url: str, tokens: int = 0, **kwargs):
+        """HTTP com a mesma política de `call`; status retentáveis viram exceção."""
+        if self.base_url and not url.startswith(("http://", "https://")):
+            url = f"{self.base_url}/{url.lstrip('/')}"
+        kwargs.setdefault("timeout", self.timeout)
+
+        def _send():
+            response = self.session.request(method, url, **kwargs)
+            if response.status_code in RETRYABLE_STATUS:
+                response.raise_for_status()
+            return response
+
+        return self.call(_send, tokens=tokens)
+
+    def close(self):
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+_services: Dict[str, ServiceClient] = {}
+_services_lock = threading.Lock()
+
+def get_service(name: str, **config) -> ServiceClient:
+    """
+    Cliente único por provedor no processo: pool de conexões, cota e circuito
+    são compartilhados por todos os decks (inclusive no modo batch).
+    `config` só vale na criação.
+    """
+    with _services_lock:
+        client = _services.get(name)
+        if client is None:
+            client = _services[name] = ServiceClient(name, **config)
+        return client